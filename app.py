@@ -1,6 +1,9 @@
 import streamlit as st
-from PIL import Image, ImageFilter, ImageEnhance
-import io
+
+from stegocam import caching, metrics, profiling, ui
+
+# Sampled per rerun when STEGOCAM_PROFILE_DIR is set
+profiling.begin("app")
 
 # Set page config
 st.set_page_config(
@@ -49,15 +52,19 @@ st.write("Take a selfie, apply cool filters, and download your masterpiece!")
 img_file = st.camera_input("Take a selfie")
 
 if img_file is not None:
+    from stegocam import filters  # NumPy is only needed once there is a selfie
+
     # Convert to PIL Image
-    img = Image.open(img_file)
+    img = ui.open_image(img_file)
+    
+    frame_digest = caching.image_digest(img)
     
     # Create columns for layout
     col1, col2 = st.columns([2, 1])
     
     with col1:
         st.subheader("Your Selfie")
-        st.image(img, use_column_width=True)
+        st.image(caching.cached_preview(img, "None", frame_digest), use_column_width=True)
     
     with col2:
         st.subheader("Filters")
@@ -65,38 +72,21 @@ if img_file is not None:
         # Filter options
         filter_option = st.selectbox(
             "Select a filter:",
-            ["None", "Black & White", "Vintage", "Blur", "Sharp", "Warm", "Cool"]
+            filters.FILTERS
         )
         
-        # Apply selected filter
-        if filter_option == "Black & White":
-            filtered_img = img.convert("L")
-        elif filter_option == "Vintage":
-            filtered_img = img.filter(ImageFilter.SMOOTH)
-            filtered_img = ImageEnhance.Color(filtered_img).enhance(0.7)
-            filtered_img = ImageEnhance.Brightness(filtered_img).enhance(0.9)
-        elif filter_option == "Blur":
-            filtered_img = img.filter(ImageFilter.GaussianBlur(radius=2))
-        elif filter_option == "Sharp":
-            filtered_img = img.filter(ImageFilter.SHARPEN)
-        elif filter_option == "Warm":
-            filtered_img = ImageEnhance.Color(img).enhance(1.5)
-        elif filter_option == "Cool":
-            filtered_img = ImageEnhance.Color(img).enhance(0.5)
-        else:
-            filtered_img = img.copy()
+        # Apply selected filter to a preview-sized proxy
+        # Cached per frame + filter, so unrelated widget changes don't re-filter
+        filtered_preview = caching.cached_preview(img, filter_option, frame_digest)
         
         # Display filtered image
-        st.image(filtered_img, use_column_width=True)
-        
-        # Create download button
-        img_byte_arr = io.BytesIO()
-        filtered_img.save(img_byte_arr, format='PNG')
-        img_byte_arr = img_byte_arr.getvalue()
+        st.image(filtered_preview, use_column_width=True)
         
+        # Create download button; the full-resolution filter and PNG encode
+        # only run when it is clicked
         st.download_button(
             label="Download Selfie",
-            data=img_byte_arr,
+            data=lambda: caching.png_bytes(caching.cached_filter(img, filter_option, frame_digest)),
             file_name="cool_selfie.png",
             mime="image/png",
             key="download_button"
@@ -108,3 +98,7 @@ if img_file is not None:
 # Footer
 st.markdown("---")
 st.markdown("<p style='text-align: center; color: #666;'>Made with ❤️ using Streamlit</p>", unsafe_allow_html=True)
+
+# Stage timings, when STEGOCAM_METRICS is set
+metrics.sidebar()
+profiling.end()
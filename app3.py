@@ -1,13 +1,10 @@
 import streamlit as st
-from PIL import Image, ImageFilter, ImageEnhance
-import io
-import datetime
-import numpy as np
-from cryptography.fernet import Fernet
-import base64
-import hashlib
-import string
-import random
+import tempfile
+
+from stegocam import caching, crypto, metrics, profiling, ui
+
+# Sampled per rerun when STEGOCAM_PROFILE_DIR is set
+profiling.begin("app3")
 
 # Streamlit page config
 st.set_page_config(
@@ -17,246 +14,33 @@ st.set_page_config(
 )
 
 # ========== STYLE ==========
-st.markdown("""
-<style>
-    .main { background-color: #f7f9fc; }
-    .stButton button {
-        background-color: #ff4b4b;
-        color: white;
-        border-radius: 10px;
-        padding: 10px 20px;
-        font-weight: bold;
-        transition: background-color 0.3s;
-    }
-    .stDownloadButton button {
-        background-color: #00a8ff;
-        color: white;
-        border-radius: 10px;
-        padding: 10px 20px;
-        font-weight: bold;
-        transition: background-color 0.3s;
-    }
-    h1 {
-        color: #1a1a1a;
-        text-align: center;
-        padding-bottom: 10px;
-    }
-    .encryption-box, .decryption-box {
-        padding: 20px;
-        border-radius: 12px;
-        margin-bottom: 25px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    }
-    .encryption-box { border-left: 5px solid #00a8ff; background-color: #e8f4fc; }
-    .decryption-box { border-left: 5px solid #ff4b4b; background-color: #f0e8fc; }
-</style>
-""", unsafe_allow_html=True)
-
-# ========== KEY/PASSCODE FUNCTIONS (UPDATED) ==========
-
-# 1. Generate the short, memorable passcode (3 alpha, 3 numeric)
-def generate_memorable_passcode():
-    letters = ''.join(random.choice(string.ascii_letters) for _ in range(3))
-    numbers = ''.join(random.choice(string.digits) for _ in range(3))
-    passcode_list = list(letters + numbers)
-    random.shuffle(passcode_list)
-    return "".join(passcode_list)
-
-# 2. Derive the Fernet Key from the passcode using a KDF (SHA256)
-def derive_fernet_key(passcode_str):
-    # This acts as a fixed salt, which is acceptable for a single-user demo
-    salt = b"encrypted_selfie_app_salt_v1"
-    
-    # Hash the passcode + salt to get a 32-byte (256-bit) key
-    hashed = hashlib.sha256(salt + passcode_str.encode()).digest()
-    
-    # The Fernet key must be base64-encoded and URL-safe.
-    fernet_key = base64.urlsafe_b64encode(hashed)
-    return fernet_key
-
-# 3. Combined Key Generation for UI
-def get_passcode_and_key():
-    passcode = generate_memorable_passcode()
-    fernet_key = derive_fernet_key(passcode)
-    return passcode, fernet_key
-
-# ========== ENCRYPTION/DECRYPTION FUNCTIONS (UNCHANGED) ==========
-
-# Encrypt data
-def encrypt_data(data, key):
-    f = Fernet(key)
-    encrypted_data = f.encrypt(data.encode())
-    return encrypted_data
-
-# Decrypt data
-def decrypt_data(encrypted_data, key):
-    f = Fernet(key)
-    try:
-        decrypted_data = f.decrypt(encrypted_data).decode()
-        return decrypted_data
-    except Exception:
-        return None
-
-# Embed encrypted data into image (LSB Steganography)
-def embed_data_in_image(image, encrypted_data):
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-        
-    binary_data = ''.join(format(byte, '08b') for byte in encrypted_data)
-    delimiter = '1111111100000000' # A unique 16-bit marker to signal end of data
-    binary_data += delimiter
-
-    img_array = np.array(image, dtype=np.uint8)
-    flat_array = img_array.flatten().copy()  # ensure writable
-
-    if len(binary_data) > flat_array.size:
-        st.error(f"❌ Image is too small (Capacity: {flat_array.size} bits) to hold encrypted data ({len(binary_data)} bits).")
-        return None
-
-    # Safe bit embedding using 0xFE to clear the last bit before setting it
-    for i, bit in enumerate(binary_data):
-        if i >= len(flat_array):
-            break
-        flat_array[i] = (flat_array[i] & 0xFE) | int(bit)
-
-    embedded_array = flat_array.reshape(img_array.shape)
-    embedded_img = Image.fromarray(embedded_array.astype('uint8'), 'RGB')
-
-    return embedded_img
-
-# Extract encrypted data from image
-def extract_data_from_image(image):
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-
-    img_array = np.array(image, dtype=np.uint8)
-    flat_array = img_array.flatten()
-
-    binary_data = ''.join([str(pixel & 1) for pixel in flat_array])
-    delimiter = '1111111100000000'
-    delimiter_pos = binary_data.find(delimiter)
-
-    if delimiter_pos == -1:
-        return None
-
-    binary_data = binary_data[:delimiter_pos]
-    
-    # Convert binary string back to bytes
-    byte_data = bytearray()
-    for i in range(0, len(binary_data), 8):
-        byte = binary_data[i:i+8]
-        if len(byte) == 8:
-            byte_data.append(int(byte, 2))
-
-    return bytes(byte_data)
+ui.apply_style()
 
 # ========== UI ==========
 
 st.title("🔐 Encrypted Selfie App")
 st.write("Take a selfie, embed secret encrypted info, and decrypt it later using a simple 6-character passcode!")
 
-tab1, tab2 = st.tabs(["📸 Capture & Encrypt", "🔓 Decrypt Image"])
+tab1, tab2, tab3 = st.tabs(["📸 Capture & Encrypt", "🔓 Decrypt Image", "🎥 Live Video"])
 
 # ---------- ENCRYPTION TAB ----------
 with tab1:
     img_file = st.camera_input("Take a selfie")
 
     if img_file is not None:
-        img = Image.open(img_file)
-        col1, col2 = st.columns([2, 1])
-
-        with col1:
-            st.subheader("Your Selfie")
-            st.image(img, width="stretch")
-
-        with col2:
-            st.subheader("Filters")
-            filter_option = st.selectbox(
-                "Select a filter:",
-                ["None", "Black & White", "Vintage", "Blur", "Sharp", "Warm", "Cool"]
-            )
-
-            if filter_option == "Black & White":
-                filtered_img = img.convert("L").convert("RGB")
-            elif filter_option == "Vintage":
-                filtered_img = img.filter(ImageFilter.SMOOTH)
-                filtered_img = ImageEnhance.Color(filtered_img).enhance(0.7)
-                filtered_img = ImageEnhance.Brightness(filtered_img).enhance(0.9)
-            elif filter_option == "Blur":
-                filtered_img = img.filter(ImageFilter.GaussianBlur(radius=2))
-            elif filter_option == "Sharp":
-                filtered_img = img.filter(ImageFilter.SHARPEN)
-            elif filter_option == "Warm":
-                filtered_img = ImageEnhance.Color(img).enhance(1.5)
-            elif filter_option == "Cool":
-                filtered_img = ImageEnhance.Color(img).enhance(0.5)
-            else:
-                filtered_img = img.copy()
-
-            st.image(filtered_img, width="stretch")
+        img = ui.open_image(img_file)
+        frame_digest = caching.image_digest(img)
+        filter_option = ui.filter_preview(img, frame_digest)
 
         st.markdown('<div class="encryption-box">', unsafe_allow_html=True)
         st.subheader("🔒 Add Encrypted Metadata")
 
-        now = datetime.datetime.now()
-        col_date, col_time = st.columns(2)
-        with col_date:
-            selected_date = st.date_input("Date", now.date())
-        with col_time:
-            selected_time = st.time_input("Time", now.time())
-
-        custom_message = st.text_area("Custom Secret Message", "This is my encrypted selfie! Remember this moment.", height=100)
-
-        # --- KEY/PASSCODE LOGIC ---
-        key_option = st.radio("Encryption Passcode", ["Generate New Passcode", "Use Existing Passcode"], index=0)
-
-        user_passcode = None
-        fernet_key = None
-
-        if key_option == "Generate New Passcode":
-            passcode, derived_key = get_passcode_and_key()
-            st.code(passcode, language="text")
-            st.info("🔑 **This is your 6-character passcode.** You need this exact string to decrypt later.")
-            user_passcode = passcode
-            fernet_key = derived_key
-        else:
-            passcode_input = st.text_input("Enter Existing Passcode (6 characters)", type="password", max_chars=6)
-            if passcode_input and len(passcode_input) == 6:
-                try:
-                    user_passcode = passcode_input
-                    fernet_key = derive_fernet_key(user_passcode)
-                    Fernet(fernet_key) # Test if key is valid (derived successfully)
-                except Exception:
-                    st.error("❌ Invalid Passcode format!")
-                    fernet_key = None
-            elif passcode_input:
-                 st.warning("Passcode must be exactly 6 characters.")
-
+        serialized_data = ui.metadata_form()
 
+        # A generated passcode is kept across reruns until a new selfie is taken
+        fernet_key = ui.passcode_picker(frame_digest)
         if fernet_key:
-            serialized_data = (
-                f"Date: {selected_date.strftime('%Y-%m-%d')} | "
-                f"Time: {selected_time.strftime('%H:%M:%S')} | "
-                f"Message: {custom_message}"
-            )
-            
-            # Encrypt the metadata using the securely derived Fernet key
-            encrypted_data = encrypt_data(serialized_data, fernet_key)
-            
-            # Embed the encrypted data into the filtered image
-            encrypted_img = embed_data_in_image(filtered_img, encrypted_data)
-
-            if encrypted_img:
-                st.success("✅ Data encrypted and embedded successfully!")
-
-                img_bytes = io.BytesIO()
-                encrypted_img.save(img_bytes, format='PNG')
-                st.download_button(
-                    label="⬇️ Download Encrypted Selfie (.png)",
-                    data=img_bytes.getvalue(),
-                    file_name="encrypted_secret_selfie.png",
-                    mime="image/png"
-                )
+            ui.embed_download(img, filter_option, serialized_data, fernet_key, frame_digest)
 
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -265,49 +49,81 @@ with tab2:
     st.markdown('<div class="decryption-box">', unsafe_allow_html=True)
     st.subheader("🔓 Decrypt Image Metadata")
 
-    uploaded_file = st.file_uploader("Upload encrypted image (.png recommended)", type=["png", "jpg", "jpeg"])
+    ui.decrypt_section("Decrypt", ui.show_message)
 
-    if uploaded_file is not None:
-        try:
-            encrypted_img = Image.open(uploaded_file)
-            st.image(encrypted_img, caption="Uploaded Encrypted Image", width="stretch")
-        except Exception as e:
-            st.error(f"❌ Could not open image: {e}")
-            uploaded_file = None
-
-
-    if uploaded_file is not None:
-        passcode_input = st.text_input("Enter 6-character Passcode", key="decryption_key_input", type="password", max_chars=6)
+    st.markdown('</div>', unsafe_allow_html=True)
 
-        if st.button("Decrypt"):
-            if passcode_input and len(passcode_input) == 6:
-                try:
-                    # 1. Derive the secure Fernet key from the user's passcode
-                    decryption_fernet_key = derive_fernet_key(passcode_input)
-                    
-                    # 2. Extract the encrypted data from the image
-                    extracted_data = extract_data_from_image(encrypted_img)
+# ---------- LIVE VIDEO TAB ----------
+with tab3:
+    st.subheader("🎥 Hide a Message in a Live Video")
+    st.write("The message is split across the frames of your camera stream. Stop the stream, "
+             "download the last frames, and decrypt them later with the passcode.")
+
+    # The stream, its passcode and the WebRTC stack are only set up once the
+    # user asks for them; tabs do not render lazily
+    if st.toggle("Start live video", key="live_video_enabled"):
+        video_message = st.text_area("Secret Message", "This is my encrypted video!", height=100, key="video_message")
+        video_passcode, video_key = caching.stable_secret("video_passcode", "video", crypto.new_passcode)
+        st.code(video_passcode, language="text")
+        st.info("🔑 **This is your 6-character passcode** for the recorded video.")
+
+        # Encrypted once per message, so the stream keeps the same segments
+        # across reruns
+        encrypted_message = caching.stable_secret(
+            "video_encrypted_message", (video_message, video_passcode),
+            lambda: crypto.encrypt_bytes(video_message.encode(), video_key, ui.PAYLOAD_CIPHER),
+        )
+
+        from stegocam import live  # streamlit-webrtc is only needed here
+
+        ctx, embedder = live.live_embedding_stream(encrypted_message, ui.PAYLOAD_CIPHER)
+        if embedder.error is not None:
+            st.error(f"❌ Could not embed the message into the stream: {embedder.error}")
+        elif not ctx.state.playing and embedder.complete():
+            st.download_button(
+                label="⬇️ Download Recorded Frames (.zip)",
+                # The last full message cycle, zipped as PNGs on click
+                data=embedder.zip_recording,
+                file_name="encrypted_video_frames.zip",
+                mime="application/zip"
+            )
 
-                    if extracted_data:
-                        # 3. Decrypt the extracted data using the derived Fernet key
-                        decrypted_data = decrypt_data(extracted_data, decryption_fernet_key)
-                        
-                        if decrypted_data:
-                            st.success("✅ Decryption Successful! Secret Message Revealed:")
-                            st.code(decrypted_data, language="text")
-                        else:
-                            st.error("❌ Incorrect passcode or corrupted encrypted data.")
-                    else:
-                        st.error("⚠️ No encrypted data (or delimiter) found in this image.")
-                except Exception as e:
-                    st.error(f"❌ An internal error occurred: {e}")
-            elif passcode_input:
-                st.warning("Passcode must be exactly 6 characters.")
+    st.markdown("---")
+    st.subheader("🔓 Decrypt a Recorded Video")
+    frames_file = st.file_uploader("Upload recorded frames (.zip of PNG frames)", type=["zip"])
+    video_passcode_input = st.text_input("Enter 6-character Passcode", key="video_decryption_key_input",
+                                         type="password", max_chars=crypto.PASSCODE_LENGTH)
+
+    if frames_file is not None and st.button("Decrypt Video"):
+        profiling.tag("decrypt_video")
+        video_decryption_key = ui.typed_passcode(video_passcode_input, required=True)
+        if video_decryption_key:
+            from stegocam import video  # NumPy is only needed here
+
+            try:
+                with tempfile.NamedTemporaryFile(suffix=".zip") as recording:
+                    recording.write(frames_file.getvalue())
+                    recording.flush()
+                    found = video.extract_video_message(video.iter_frames(recording.name))
+            except Exception as e:  # not a zip archive, or a frame that does not decode
+                found = None
+                st.error(f"❌ Could not read the recorded frames: {e}")
             else:
-                st.warning("Please enter your 6-character passcode.")
+                if found is None:
+                    st.error("⚠️ No complete message found in these frames.")
 
-    st.markdown('</div>', unsafe_allow_html=True)
+            if found is not None:
+                cipher, extracted_data = found
+                try:
+                    decrypted_data = crypto.decrypt_bytes(extracted_data, video_decryption_key, cipher)
+                except Exception:  # InvalidTag, InvalidToken
+                    st.error("❌ Incorrect passcode or corrupted encrypted data.")
+                else:
+                    ui.show_message(None, decrypted_data)
 
 # ---------- FOOTER ----------
-st.markdown("---")
-st.markdown("<p style='text-align:center; color:#777;'>Made with ❤️ using Streamlit, Fernet, and LSB Steganography</p>", unsafe_allow_html=True)
+ui.footer()
+
+# Stage timings, when STEGOCAM_METRICS is set
+metrics.sidebar()
+profiling.end()
@@ -1,445 +1,5 @@
-import streamlit as st
-from PIL import Image, ImageFilter, ImageEnhance
-import io
-import datetime
-import numpy as np
-from cryptography.fernet import Fernet
-import base64
-import hashlib
-import string
-import random
-import streamlit.components.v1 as components
+from stegocam import ui
 
-# Streamlit page config
-st.set_page_config(
-    page_title="🔐 Dual Camera Encryption App",
-    page_icon="📷",
-    layout="centered"
-)
-
-# ========== STYLE ==========
-st.markdown("""
-<style>
-    .main { background-color: #f7f9fc; }
-    .stButton button {
-        background-color: #ff4b4b;
-        color: white;
-        border-radius: 10px;
-        padding: 10px 20px;
-        font-weight: bold;
-        transition: background-color 0.3s;
-    }
-    .stDownloadButton button {
-        background-color: #00a8ff;
-        color: white;
-        border-radius: 10px;
-        padding: 10px 20px;
-        font-weight: bold;
-        transition: background-color 0.3s;
-    }
-    h1 {
-        color: #1a1a1a;
-        text-align: center;
-        padding-bottom: 10px;
-    }
-    .encryption-box, .decryption-box {
-        padding: 20px;
-        border-radius: 12px;
-        margin-bottom: 25px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    }
-    .encryption-box { border-left: 5px solid #00a8ff; background-color: #e8f4fc; }
-    .decryption-box { border-left: 5px solid #ff4b4b; background-color: #f0e8fc; }
-    .camera-container {
-        display: flex;
-        flex-direction: column;
-        align-items: center;
-        gap: 15px;
-    }
-    .camera-controls {
-        display: flex;
-        gap: 10px;
-        margin-top: 10px;
-    }
-    .camera-btn {
-        padding: 8px 16px;
-        border-radius: 8px;
-        border: none;
-        cursor: pointer;
-        font-weight: bold;
-        transition: background-color 0.3s;
-    }
-    .camera-btn.primary {
-        background-color: #00a8ff;
-        color: white;
-    }
-    .camera-btn.secondary {
-        background-color: #f0f0f0;
-        color: #333;
-    }
-    .camera-btn:hover {
-        opacity: 0.9;
-    }
-    .step-container {
-        background-color: #f0f8ff;
-        border-radius: 10px;
-        padding: 15px;
-        margin-bottom: 20px;
-        border-left: 4px solid #00a8ff;
-    }
-    .step-title {
-        font-weight: bold;
-        color: #00a8ff;
-        margin-bottom: 10px;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# ========== KEY/PASSCODE FUNCTIONS ==========
-
-# Generate the short, memorable passcode (3 alpha, 3 numeric)
-def generate_memorable_passcode():
-    letters = ''.join(random.choice(string.ascii_letters) for _ in range(3))
-    numbers = ''.join(random.choice(string.digits) for _ in range(3))
-    passcode_list = list(letters + numbers)
-    random.shuffle(passcode_list)
-    return "".join(passcode_list)
-
-# Derive the Fernet Key from the passcode using a KDF (SHA256)
-def derive_fernet_key(passcode_str):
-    salt = b"encrypted_selfie_app_salt_v1"
-    hashed = hashlib.sha256(salt + passcode_str.encode()).digest()
-    fernet_key = base64.urlsafe_b64encode(hashed)
-    return fernet_key
-
-# Combined Key Generation for UI
-def get_passcode_and_key():
-    passcode = generate_memorable_passcode()
-    fernet_key = derive_fernet_key(passcode)
-    return passcode, fernet_key
-
-# ========== ENCRYPTION/DECRYPTION FUNCTIONS ==========
-
-# Encrypt image data
-def encrypt_image_data(image, key):
-    # Convert image to bytes
-    img_bytes = io.BytesIO()
-    image.save(img_bytes, format='PNG')
-    img_data = img_bytes.getvalue()
-    
-    # Encrypt the image data
-    f = Fernet(key)
-    encrypted_data = f.encrypt(img_data)
-    return encrypted_data
-
-# Decrypt image data
-def decrypt_image_data(encrypted_data, key):
-    f = Fernet(key)
-    try:
-        decrypted_data = f.decrypt(encrypted_data)
-        return decrypted_data
-    except Exception:
-        return None
-
-# Embed encrypted data into image (LSB Steganography)
-def embed_data_in_image(image, encrypted_data):
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-        
-    binary_data = ''.join(format(byte, '08b') for byte in encrypted_data)
-    delimiter = '1111111100000000'  # A unique 16-bit marker to signal end of data
-    binary_data += delimiter
-
-    img_array = np.array(image, dtype=np.uint8)
-    flat_array = img_array.flatten().copy()  # ensure writable
-
-    if len(binary_data) > flat_array.size:
-        st.error(f"❌ Image is too small (Capacity: {flat_array.size} bits) to hold encrypted data ({len(binary_data)} bits).")
-        return None
-
-    # Safe bit embedding using 0xFE to clear the last bit before setting it
-    for i, bit in enumerate(binary_data):
-        if i >= len(flat_array):
-            break
-        flat_array[i] = (flat_array[i] & 0xFE) | int(bit)
-
-    embedded_array = flat_array.reshape(img_array.shape)
-    embedded_img = Image.fromarray(embedded_array.astype('uint8'), 'RGB')
-
-    return embedded_img
-
-# Extract encrypted data from image
-def extract_data_from_image(image):
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-
-    img_array = np.array(image, dtype=np.uint8)
-    flat_array = img_array.flatten()
-
-    binary_data = ''.join([str(pixel & 1) for pixel in flat_array])
-    delimiter = '1111111100000000'
-    delimiter_pos = binary_data.find(delimiter)
-
-    if delimiter_pos == -1:
-        return None
-
-    binary_data = binary_data[:delimiter_pos]
-    
-    # Convert binary string back to bytes
-    byte_data = bytearray()
-    for i in range(0, len(binary_data), 8):
-        byte = binary_data[i:i+8]
-        if len(byte) == 8:
-            byte_data.append(int(byte, 2))
-
-    return bytes(byte_data)
-
-# ========== CUSTOM CAMERA COMPONENT ==========
-def camera_component(facing_mode='user'):
-    component_value = components.html(
-        f"""
-        <div class="camera-container">
-            <video id="video" width="100%" autoplay playsinline></video>
-            <div class="camera-controls">
-                <button id="capture" class="camera-btn primary">Capture Photo</button>
-            </div>
-            <canvas id="canvas" style="display:none;"></canvas>
-        </div>
-
-        <script>
-        const video = document.getElementById('video');
-        const canvas = document.getElementById('canvas');
-        const context = canvas.getContext('2d');
-        const captureBtn = document.getElementById('capture');
-        
-        let currentStream = null;
-        let facingMode = '{facing_mode}'; // Set by parameter
-        
-        // Function to start the camera with specified facing mode
-        function startCamera() {{
-            if (currentStream) {{
-                currentStream.getTracks().forEach(track => track.stop());
-            }}
-            
-            const constraints = {{
-                video: {{
-                    facingMode: facingMode,
-                    width: {{ ideal: 1280 }},
-                    height: {{ ideal: 720 }}
-                }}
-            }};
-            
-            navigator.mediaDevices.getUserMedia(constraints)
-                .then(stream => {{
-                    currentStream = stream;
-                    video.srcObject = stream;
-                }})
-                .catch(err => {{
-                    console.error("Error accessing camera: ", err);
-                    alert("Could not access the camera. Please ensure you have granted camera permissions.");
-                }});
-        }}
-        
-        // Initialize camera
-        startCamera();
-        
-        // Capture button click
-        captureBtn.addEventListener('click', () => {{
-            canvas.width = video.videoWidth;
-            canvas.height = video.videoHeight;
-            context.drawImage(video, 0, 0, canvas.width, canvas.height);
-            
-            // Convert canvas to data URL and send to Streamlit
-            const dataURL = canvas.toDataURL('image/png');
-            window.parent.postMessage({{
-                type: 'streamlit:setComponentValue',
-                value: {{
-                    image: dataURL
-                }}
-            }}, '*');
-        }});
-        </script>
-        """,
-        height=500
-    )
-    
-    if component_value and 'image' in component_value:
-        # Convert data URL to PIL Image
-        header, encoded = component_value['image'].split(',', 1)
-        data = base64.b64decode(encoded)
-        img = Image.open(io.BytesIO(data))
-        return img
-    return None
-
-# ========== UI ==========
-
-st.title("🔐 Dual Camera Encryption App")
-st.write("Capture an image with the back camera, then automatically capture a selfie with the front camera and encrypt it within the first image!")
-
-# Initialize session state variables
-if 'step' not in st.session_state:
-    st.session_state.step = 1
-if 'back_camera_image' not in st.session_state:
-    st.session_state.back_camera_image = None
-if 'front_camera_image' not in st.session_state:
-    st.session_state.front_camera_image = None
-if 'passcode' not in st.session_state:
-    st.session_state.passcode = None
-if 'fernet_key' not in st.session_state:
-    st.session_state.fernet_key = None
-
-# Step 1: Capture Back Camera Image
-if st.session_state.step == 1:
-    st.markdown('<div class="step-container">', unsafe_allow_html=True)
-    st.markdown('<div class="step-title">Step 1: Capture Main Image (Back Camera)</div>', unsafe_allow_html=True)
-    st.write("Point your back camera at the subject you want to photograph.")
-    
-    back_img = camera_component(facing_mode='environment')
-    
-    if back_img is not None:
-        st.session_state.back_camera_image = back_img
-        st.image(back_img, caption="Main Image (Back Camera)", width="stretch")
-        
-        if st.button("Continue to Front Camera", key="continue_to_front"):
-            st.session_state.step = 2
-            st.rerun()
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# Step 2: Capture Front Camera Image
-elif st.session_state.step == 2:
-    st.markdown('<div class="step-container">', unsafe_allow_html=True)
-    st.markdown('<div class="step-title">Step 2: Capture Selfie (Front Camera)</div>', unsafe_allow_html=True)
-    st.write("Now take a selfie with your front camera. This image will be encrypted and hidden in the main image.")
-    
-    front_img = camera_component(facing_mode='user')
-    
-    if front_img is not None:
-        st.session_state.front_camera_image = front_img
-        st.image(front_img, caption="Selfie (Front Camera)", width="stretch")
-        
-        if st.button("Encrypt Selfie in Main Image", key="encrypt_images"):
-            st.session_state.step = 3
-            st.rerun()
-    
-    if st.button("Back to Main Image", key="back_to_main"):
-        st.session_state.step = 1
-        st.rerun()
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# Step 3: Encrypt and Combine
-elif st.session_state.step == 3:
-    st.markdown('<div class="step-container">', unsafe_allow_html=True)
-    st.markdown('<div class="step-title">Step 3: Encrypt Selfie in Main Image</div>', unsafe_allow_html=True)
-    
-    # Display both images
-    col1, col2 = st.columns(2)
-    with col1:
-        st.image(st.session_state.back_camera_image, caption="Main Image (Back Camera)", width="stretch")
-    with col2:
-        st.image(st.session_state.front_camera_image, caption="Selfie (Front Camera)", width="stretch")
-    
-    # Generate encryption key
-    passcode, fernet_key = get_passcode_and_key()
-    st.session_state.passcode = passcode
-    st.session_state.fernet_key = fernet_key
-    
-    st.code(passcode, language="text")
-    st.info("🔑 **This is your 6-character passcode.** You need this exact string to decrypt the hidden selfie later.")
-    
-    # Encrypt the front camera image
-    encrypted_selfie = encrypt_image_data(st.session_state.front_camera_image, fernet_key)
-    
-    # Embed the encrypted selfie into the back camera image
-    encrypted_img = embed_data_in_image(st.session_state.back_camera_image, encrypted_selfie)
-    
-    if encrypted_img:
-        st.success("✅ Selfie encrypted and embedded successfully!")
-        st.image(encrypted_img, caption="Final Encrypted Image", width="stretch")
-        
-        img_bytes = io.BytesIO()
-        encrypted_img.save(img_bytes, format='PNG')
-        st.download_button(
-            label="⬇️ Download Encrypted Image (.png)",
-            data=img_bytes.getvalue(),
-            file_name="dual_camera_encrypted_image.png",
-            mime="image/png"
-        )
-    
-    if st.button("Start Over", key="start_over"):
-        st.session_state.step = 1
-        st.session_state.back_camera_image = None
-        st.session_state.front_camera_image = None
-        st.rerun()
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# Decryption Tab
-tab1, tab2 = st.tabs(["📸 Capture & Encrypt", "🔓 Decrypt Image"])
-
-with tab1:
-    # The capture and encryption process is handled above
-    pass
-
-with tab2:
-    st.markdown('<div class="decryption-box">', unsafe_allow_html=True)
-    st.subheader("🔓 Decrypt Hidden Selfie")
-    
-    uploaded_file = st.file_uploader("Upload encrypted image (.png recommended)", type=["png", "jpg", "jpeg"])
-    
-    if uploaded_file is not None:
-        try:
-            encrypted_img = Image.open(uploaded_file)
-            st.image(encrypted_img, caption="Uploaded Encrypted Image", width="stretch")
-        except Exception as e:
-            st.error(f"❌ Could not open image: {e}")
-            uploaded_file = None
-    
-    if uploaded_file is not None:
-        passcode_input = st.text_input("Enter 6-character Passcode", key="decryption_key_input", type="password", max_chars=6)
-        
-        if st.button("Decrypt Hidden Selfie"):
-            if passcode_input and len(passcode_input) == 6:
-                try:
-                    # Derive the Fernet key from the passcode
-                    decryption_fernet_key = derive_fernet_key(passcode_input)
-                    
-                    # Extract the encrypted data from the image
-                    extracted_data = extract_data_from_image(encrypted_img)
-                    
-                    if extracted_data:
-                        # Decrypt the extracted data
-                        decrypted_data = decrypt_image_data(extracted_data, decryption_fernet_key)
-                        
-                        if decrypted_data:
-                            # Convert bytes back to image
-                            hidden_selfie = Image.open(io.BytesIO(decrypted_data))
-                            st.success("✅ Decryption Successful! Hidden Selfie Revealed:")
-                            st.image(hidden_selfie, caption="Hidden Selfie", width="stretch")
-                            
-                            # Option to download the hidden selfie
-                            selfie_bytes = io.BytesIO()
-                            hidden_selfie.save(selfie_bytes, format='PNG')
-                            st.download_button(
-                                label="⬇️ Download Hidden Selfie (.png)",
-                                data=selfie_bytes.getvalue(),
-                                file_name="hidden_selfie.png",
-                                mime="image/png"
-                            )
-                        else:
-                            st.error("❌ Incorrect passcode or corrupted encrypted data.")
-                    else:
-                        st.error("⚠️ No encrypted data (or delimiter) found in this image.")
-                except Exception as e:
-                    st.error(f"❌ An internal error occurred: {e}")
-            elif passcode_input:
-                st.warning("Passcode must be exactly 6 characters.")
-            else:
-                st.warning("Please enter your 6-character passcode.")
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# ---------- FOOTER ----------
-st.markdown("---")
-st.markdown("<p style='text-align:center; color:#777;'>Made with ❤️ using Streamlit, Fernet, and LSB Steganography</p>", unsafe_allow_html=True)
+# Back camera image with an encrypted front camera selfie hidden inside; the
+# steps are in stegocam/ui.py, shared with the other dual-camera app
+ui.dual_camera_app("app6")
@@ -0,0 +1,72 @@
+"""Compare the vectorized LSB embedder with the original per-bit loop.
+
+Usage: python benchmarks/bench_embed.py [--payload-kb N] [--bits 1|2|4] [--skip-legacy]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stegocam import container, stego
+
+FRAMES = {
+    "720p": (1280, 720),
+    "4K": (3840, 2160),
+}
+
+
+# The embedder the apps shipped with (delimiter format), kept as the reference point
+def legacy_embed(image, encrypted_data):
+    binary_data = ''.join(format(byte, '08b') for byte in encrypted_data)
+    binary_data += '1111111100000000'
+
+    img_array = np.array(image, dtype=np.uint8)
+    flat_array = img_array.flatten().copy()
+
+    for i, bit in enumerate(binary_data):
+        if i >= len(flat_array):
+            break
+        flat_array[i] = (flat_array[i] & 0xFE) | int(bit)
+
+    return Image.fromarray(flat_array.reshape(img_array.shape).astype('uint8'), 'RGB')
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload-kb", type=int, default=256, help="payload size in KiB (default: 256)")
+    parser.add_argument("--bits", type=int, default=1, choices=container.BIT_DEPTHS, help="LSBs per channel")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the vectorized engine")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    payload = rng.integers(0, 256, args.payload_kb * 1024, dtype=np.uint8).tobytes()
+
+    print(f"payload: {len(payload)} bytes ({(len(payload) + container.HEADER_SIZE) * 8} bits with header)")
+    for label, (width, height) in FRAMES.items():
+        frame = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), 'RGB')
+        fast, fast_img = best_of(lambda: stego.embed_data_in_image(frame, payload, bits=args.bits), args.repeat)
+        assert stego.extract_data_from_image(fast_img) == payload, "round trip failed"
+        line = f"{label:>5}  vectorized {fast * 1000:9.1f} ms"
+        if not args.skip_legacy:
+            slow, _ = best_of(lambda: legacy_embed(frame, payload), 1)
+            line += f"   legacy {slow * 1000:9.1f} ms   speedup {slow / fast:6.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
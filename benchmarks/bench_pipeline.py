@@ -0,0 +1,232 @@
+"""Time each stage of the capture -> filter -> encrypt -> embed -> encode pipeline.
+
+Every combination of frame size and payload is run stage by stage and end
+to end; each stage reports its best wall time over --repeat runs and, from
+one extra run under tracemalloc, its peak traced allocation (Python objects
+and numpy arrays; PIL's and OpenCV's own buffers are not traced). Payloads
+that do not fit a frame even at 4 LSBs per channel are reported as skipped.
+
+Results can be saved as JSON and compared with an earlier run on the same
+machine; --compare prints the time ratio per stage and exits 1 when any
+stage got slower than --threshold (and by more than a millisecond).
+
+Usage: python benchmarks/bench_pipeline.py [--frames 480p,720p,...] [--payloads metadata,selfie]
+                                           [--repeat N] [--json OUT] [--compare OLD] [--threshold R]
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import PIL
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from check_filter_parity import synthetic_frame  # noqa: E402
+
+from stegocam import camera, codec, crypto, filters, stego  # noqa: E402
+
+FRAMES = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+STAGES = ("capture", "filter", "encrypt", "embed", "encode", "extract", "end_to_end")
+CAPTURE_QUALITY = 90
+# Sub-millisecond stages are too noisy to flag on their ratio alone
+MIN_REGRESSION_SECONDS = 0.001
+
+
+# Payloads the apps embed: the metadata string of the selfie apps (64 bytes)
+# and a full PNG selfie, the largest payload the dual-camera apps ever hid
+def make_payloads():
+    metadata = b"Date: 2026-01-01 | Time: 12:00:00 | Message: remember this one!"
+    return {
+        "metadata": metadata[:64].ljust(64, b"."),
+        "selfie": codec.encode_image(synthetic_frame(640, 480, seed=1), codec.PNG),
+    }
+
+
+# A captured frame as the camera component sends it: a JPEG packet
+def capture_packet(frame):
+    buffer = io.BytesIO()
+    frame.save(buffer, format="JPEG", quality=CAPTURE_QUALITY)
+    header = json.dumps({"format": "jpeg", "width": frame.width, "height": frame.height,
+                         "profile": "bench", "id": 0}).encode()
+    return camera.PACKET_HEADER.pack(len(header)) + header + buffer.getvalue()
+
+
+def png_bytes(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(frame, payload, key, filter_option, repeat):
+    packet = capture_packet(frame)
+    bits = stego.fit_bits(frame, crypto.encrypted_size(len(payload), crypto.AES_GCM))
+
+    def capture():
+        return Image.fromarray(camera.decode_frame(packet)[1])
+
+    def end_to_end():
+        captured = capture()
+        filtered = filters.apply_filter(captured, filter_option)
+        encrypted = crypto.encrypt_bytes(payload, key, crypto.AES_GCM)
+        return png_bytes(stego.embed_data_in_image(filtered, encrypted, bits, cipher=crypto.AES_GCM))
+
+    captured = capture()
+    filtered = filters.apply_filter(captured, filter_option)
+    encrypted = crypto.encrypt_bytes(payload, key, crypto.AES_GCM)
+    embedded = stego.embed_data_in_image(filtered, encrypted, bits, cipher=crypto.AES_GCM)
+    encoded = png_bytes(embedded)
+
+    def extract():
+        with Image.open(io.BytesIO(encoded)) as image:
+            header, data = stego.read_container(image)
+        return crypto.decrypt_bytes(data, key, header.cipher)
+
+    assert extract() == payload, "round trip failed"
+
+    stages = {
+        "capture": capture,
+        "filter": lambda: filters.apply_filter(captured, filter_option),
+        "encrypt": lambda: crypto.encrypt_bytes(payload, key, crypto.AES_GCM),
+        "embed": lambda: stego.embed_data_in_image(filtered, encrypted, bits, cipher=crypto.AES_GCM),
+        "encode": lambda: png_bytes(embedded),
+        "extract": extract,
+        "end_to_end": end_to_end,
+    }
+    results = {}
+    for name in STAGES:
+        seconds, _ = best_of(stages[name], repeat)
+        results[name] = {"seconds": seconds, "peak_bytes": peak_memory(stages[name])}
+    return {"bits": bits, "png_bytes": len(encoded), "stages": results}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pillow": PIL.__version__,
+        "opencv": filters.load_cv2().__version__ if filters.HAS_CV2 else None,
+        "filter_backend": filters.backend,
+        "commit": git_commit(),
+    }
+
+
+# Print the time ratio new/old per stage; returns the stages slower than threshold
+def compare(old, new, threshold):
+    old_cases = {(case["frame"], case["payload"]): case for case in old["results"]}
+    regressions = []
+    for case in new["results"]:
+        before = old_cases.get((case["frame"], case["payload"]))
+        if before is None or "stages" not in case or "stages" not in before:
+            continue
+        ratios = []
+        for name in STAGES:
+            seconds, old_seconds = case["stages"][name]["seconds"], before["stages"][name]["seconds"]
+            ratio = seconds / max(old_seconds, 1e-9)
+            ratios.append(f"{name} {ratio:4.2f}x")
+            if ratio > threshold and seconds - old_seconds > MIN_REGRESSION_SECONDS:
+                regressions.append(f"{case['frame']}/{case['payload']}/{name}")
+        print(f"{case['frame']:>6} {case['payload']:<9} " + "  ".join(ratios))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", default=",".join(FRAMES), help=f"frame sizes (default: {','.join(FRAMES)})")
+    parser.add_argument("--payloads", default="metadata,selfie", help="payloads (default: metadata,selfie)")
+    parser.add_argument("--filter", default="Vintage", choices=filters.FILTERS, help="filter stage (default: Vintage)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", metavar="OUT", help="save the results as JSON")
+    parser.add_argument("--compare", metavar="OLD", help="compare with the results of an earlier --json run")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="with --compare, fail when a stage is this many times slower (default: 1.25)")
+    args = parser.parse_args()
+
+    payloads = make_payloads()
+    key = crypto.passcode_key("bench1")
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "filter": args.filter,
+        "repeat": args.repeat,
+        "results": [],
+    }
+
+    print(f"{'frame':>6} {'payload':<9} {'bits':>4} " + " ".join(f"{name:>10}" for name in STAGES) + "   (ms)")
+    for frame_name in args.frames.split(","):
+        frame = synthetic_frame(*FRAMES[frame_name])
+        for payload_name in args.payloads.split(","):
+            payload = payloads[payload_name]
+            case = {"frame": frame_name, "payload": payload_name, "payload_bytes": len(payload)}
+            try:
+                case.update(run_case(frame, payload, key, args.filter, args.repeat))
+            except stego.CapacityError as e:
+                case["skipped"] = f"capacity {e.capacity} bits < {e.required} bits"
+                print(f"{frame_name:>6} {payload_name:<9} skipped: {case['skipped']}")
+            else:
+                stages = case["stages"]
+                print(f"{frame_name:>6} {payload_name:<9} {case['bits']:>4} "
+                      + " ".join(f"{stages[name]['seconds'] * 1000:10.1f}" for name in STAGES))
+                print(f"{'':>6} {'peak MB':<9} {'':>4} "
+                      + " ".join(f"{stages[name]['peak_bytes'] / 1e6:10.1f}" for name in STAGES))
+            report["results"].append(case)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        print(f"\nnew / old ({old['environment'].get('commit')} at {old['timestamp']}):")
+        regressions = compare(old, report, args.threshold)
+        if regressions:
+            print(f"slower than {args.threshold}x: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
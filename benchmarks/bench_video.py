@@ -0,0 +1,95 @@
+"""Time per-frame message embedding for the live video stream against a frame budget.
+
+Usage: python benchmarks/bench_video.py [--message-kb N] [--segments N] [--frames N] [--fps N]
+
+Each frame goes through what the live stream does to it: av frame to RGB
+array, VideoEmbedder.embed, the copy into the processor's ring of the last
+message cycle, RGB array back to an av frame. Exits 1 when the mean time
+per frame exceeds 1/fps or the message does not survive a round trip with
+every seventh frame dropped. The zip of one cycle, which only runs when the
+recording is downloaded, is timed and reported separately.
+"""
+import argparse
+import collections
+import os
+import sys
+import tempfile
+import time
+
+import av
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stegocam import crypto, video
+
+FRAME_SIZE = (1280, 720)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--message-kb", type=int, default=4, help="message size in KiB (default: 4)")
+    parser.add_argument("--segments", type=int, default=video.DEFAULT_SEGMENTS)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=int, default=30, help="frame rate to budget for (default: 30)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    key = crypto.generate_key()
+    message = rng.integers(0, 256, args.message_kb * 1024, dtype=np.uint8).tobytes()
+    encrypted = crypto.encrypt_bytes(message, key, crypto.AES_GCM)
+
+    width, height = FRAME_SIZE
+    sources = [av.VideoFrame.from_ndarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), format="rgb24")
+               for _ in range(4)]
+
+    start = time.perf_counter()
+    embedder = video.VideoEmbedder(encrypted, FRAME_SIZE, args.segments, cipher=crypto.AES_GCM)
+    plan_ms = (time.perf_counter() - start) * 1000
+
+    ring = collections.deque(maxlen=embedder.count)
+    recorded = []
+    embed_total = frame_total = 0.0
+    for i in range(args.frames):
+        source = sources[i % len(sources)]
+        start = time.perf_counter()
+        rgb = source.to_ndarray(format="rgb24")
+        mid = time.perf_counter()
+        embedder.embed(rgb)
+        done = time.perf_counter()
+        ring.append(rgb.copy())
+        av.VideoFrame.from_ndarray(rgb, format="rgb24")
+        end = time.perf_counter()
+        embed_total += done - mid
+        frame_total += end - start
+        if i % 7 != 3 and len(recorded) < 2 * embedder.count:
+            recorded.append(rgb.copy())
+
+    budget_ms = 1000 / args.fps
+    frame_ms = frame_total / args.frames * 1000
+    print(f"message: {len(encrypted)} encrypted bytes in {embedder.count} segments, {width}x{height} frames")
+    print(f"plan: {plan_ms:.1f} ms once")
+    print(f"embed: {embed_total / args.frames * 1000:.3f} ms/frame   "
+          f"frame total: {frame_ms:.3f} ms/frame   budget: {budget_ms:.1f} ms")
+
+    start = time.perf_counter()
+    archive = video.zip_frames(ring)
+    print(f"zip of the last cycle: {(time.perf_counter() - start) * 1000:.0f} ms, {len(archive) / 1e6:.1f} MB, "
+          f"ring {sum(rgb.nbytes for rgb in ring) / 1e6:.1f} MB")
+
+    found = video.extract_video_message(recorded)
+    ok = found is not None and crypto.decrypt_bytes(found[1], key, found[0]) == message
+    print(f"round trip with dropped frames: {'ok' if ok else 'FAILED'}")
+    with tempfile.NamedTemporaryFile(suffix=".zip") as f:
+        f.write(archive)
+        f.flush()
+        found = video.extract_video_message(video.iter_frames(f.name))
+    zip_ok = found is not None and crypto.decrypt_bytes(found[1], key, found[0]) == message
+    print(f"round trip through the zip: {'ok' if zip_ok else 'FAILED'}")
+    ok = ok and zip_ok
+    if not ok or frame_ms > budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Check the OpenCV filter backend against the PIL one and time both.
+
+Every filter is run through both backends on a synthetic photo-like frame;
+the script fails when the mean or 99th-percentile per-channel difference
+exceeds the tolerance.
+
+Usage: python benchmarks/check_filter_parity.py [--size WxH] [--mean-tol N] [--p99-tol N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stegocam import filters
+
+
+# Smooth gradients, hard-edged shapes and a little sensor noise, so both the
+# flat-region and the edge behaviour of the kernels are exercised
+def synthetic_frame(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frame = np.stack([
+        255 * x / width,
+        255 * y / height,
+        128 + 100 * np.sin(x / 37) * np.cos(y / 23),
+    ], axis=-1)
+    for _ in range(12):
+        cx, cy, r = rng.integers(0, width), rng.integers(0, height), rng.integers(10, min(width, height) // 4)
+        frame[(x - cx) ** 2 + (y - cy) ** 2 < r * r] = rng.integers(0, 256, 3)
+    frame += rng.normal(0, 4, frame.shape)
+    return Image.fromarray(np.clip(frame, 0, 255).astype(np.uint8), 'RGB')
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1920x1080", help="frame size (default: 1920x1080)")
+    parser.add_argument("--mean-tol", type=float, default=1.0, help="max mean absolute difference")
+    parser.add_argument("--p99-tol", type=float, default=3.0, help="max 99th-percentile absolute difference")
+    args = parser.parse_args()
+
+    if "opencv" not in filters.BACKENDS:
+        sys.exit("OpenCV is not installed; nothing to compare.")
+
+    width, height = (int(side) for side in args.size.lower().split("x"))
+    frame = synthetic_frame(width, height)
+    pil, opencv = filters.BACKENDS["pil"], filters.BACKENDS["opencv"]
+
+    failed = False
+    print(f"{'filter':<14} {'mean':>6} {'p99':>5} {'max':>5}   {'pil':>8} {'opencv':>8}")
+    for name in filters.FILTERS:
+        pil_time, expected = timed(lambda: pil(frame, name))
+        cv_time, actual = timed(lambda: opencv(frame, name))
+        diff = np.abs(np.asarray(expected, dtype=np.int16) - np.asarray(actual, dtype=np.int16))
+        mean, p99 = diff.mean(), np.percentile(diff, 99)
+        ok = mean <= args.mean_tol and p99 <= args.p99_tol
+        failed |= not ok
+        print(f"{name:<14} {mean:6.2f} {p99:5.0f} {diff.max():5d}   {pil_time * 1000:6.1f}ms {cv_time * 1000:6.1f}ms"
+              f"{'' if ok else '   FAIL'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
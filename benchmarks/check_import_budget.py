@@ -0,0 +1,96 @@
+"""Check the cold start of every app against an import-time budget.
+
+Each app's first page (no capture, no upload) is run once with Streamlit's
+AppTest in a fresh interpreter, as the first session after a server start
+would run it. Streamlit itself and the AppTest machinery are imported and
+warmed up on a trivial script first, and the time of a trivial run is taken
+off, so the time measured is what the app adds: its own imports plus the
+first run. The script fails when an app takes longer than its budget or
+loads a heavy module it should only load on first use (NumPy, OpenCV,
+cryptography, requests, the WebRTC stack).
+
+Streamlit's custom-component layer imports NumPy, pandas and pyarrow for any
+component, so the apps with the camera component are allowed those.
+
+Usage: python benchmarks/check_import_budget.py [--apps app.py,app2.py,...] [--scale F] [--repeat N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("numpy", "cv2", "cryptography", "requests", "av", "aiortc", "streamlit_webrtc", "pandas", "pyarrow")
+COMPONENT_MODULES = ("numpy", "pandas", "pyarrow")
+
+# Seconds each app's first page may take on top of a warmed-up Streamlit,
+# and the heavy modules it may load on the way
+BUDGETS = {
+    "app.py": (0.15, ()),
+    "app2.py": (0.2, ()),
+    "app3.py": (0.2, ()),
+    "app4.py": (0.9, COMPONENT_MODULES),
+    "app5.py": (0.9, COMPONENT_MODULES),
+    "app6.py": (0.9, COMPONENT_MODULES),
+}
+
+# Runs in the fresh interpreter; prints one JSON line. A trivial script run
+# the same way twice gives AppTest's own overhead, which is subtracted.
+PROBE = """
+import json, os, sys, tempfile, time
+from streamlit.testing.v1 import AppTest
+
+def run(path):
+    start = time.perf_counter()
+    AppTest.from_file(path, default_timeout=120).run()
+    return time.perf_counter() - start
+
+with tempfile.TemporaryDirectory() as tmp:
+    empty = os.path.join(tmp, "empty_app.py")
+    with open(empty, "w") as f:
+        f.write("import streamlit as st\\nst.write('warm up')\\n")
+    run(empty)
+    overhead = min(run(empty), run(empty))
+before = set(sys.modules)
+seconds = run(sys.argv[1]) - overhead
+print(json.dumps({"seconds": max(seconds, 0.0), "loaded": sorted(set(sys.modules) - before)}))
+"""
+
+
+def first_page(app):
+    result = subprocess.run([sys.executable, "-c", PROBE, os.path.join(ROOT, app)], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", default=",".join(BUDGETS), help=f"apps to check (default: {','.join(BUDGETS)})")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget, for slower machines")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per app; the best run counts")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'app':<9} {'ms':>7} {'budget':>7}  heavy modules loaded")
+    for app in args.apps.split(","):
+        budget, allowed = BUDGETS[app]
+        budget *= args.scale
+        runs = [first_page(app) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: run["seconds"])
+        heavy = sorted({name.partition(".")[0] for run in runs for name in run["loaded"]} & set(HEAVY_MODULES))
+        unexpected = [name for name in heavy if name not in allowed]
+        print(f"{app:<9} {best['seconds'] * 1000:7.0f} {budget * 1000:7.0f}  {', '.join(heavy) or '-'}")
+        if best["seconds"] > budget:
+            failures.append(f"{app} took {best['seconds'] * 1000:.0f} ms (budget {budget * 1000:.0f} ms)")
+        if unexpected:
+            failures.append(f"{app} loaded {', '.join(unexpected)} at start-up")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
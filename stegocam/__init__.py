@@ -0,0 +1,50 @@
+import importlib
+
+# ========== LAZY IMPORTS ==========
+#
+# Most reruns of the apps - the first page, a filter preview - never touch
+# the NumPy stego engine, the cryptography backends, OpenCV or the WebRTC
+# stack. So a heavy dependency is imported by the function (or, in an app,
+# the branch) that first needs it, never at module level where the first
+# page would pay for it:
+#
+#   - numpy, cv2, cryptography, requests, av: inside the functions using them
+#   - filters, stego, video (NumPy) and live (WebRTC): by the app branches
+#     and the functions of caching, pipeline, service, camera and ui using
+#     them; the other submodules are light and imported at the top
+#
+# The names below resolve the same way, on first access.
+#
+# benchmarks/check_import_budget.py checks what each app loads at start-up.
+
+# The core API, importable from the package itself (`from stegocam import
+# embed_message`). Everything here works without Streamlit; the apps' shared
+# widgets are in ui.
+_EXPORTS = {
+    "CapacityError": "stego",
+    "embed_data_in_image": "stego",
+    "extract_data_from_image": "stego",
+    "generate_passcode": "crypto",
+    "new_passcode": "crypto",
+    "passcode_key": "crypto",
+    "encrypt_bytes": "crypto",
+    "decrypt_bytes": "crypto",
+    "FILTERS": "filters",
+    "apply_filter": "filters",
+    "embed_message": "pipeline",
+    "extract_message": "pipeline",
+    "embed_image_stream": "pipeline",
+    "metadata_text": "pipeline",
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
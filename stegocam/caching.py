@@ -0,0 +1,120 @@
+import hashlib
+import io
+
+import streamlit as st
+
+from . import container, crypto, metrics, pipeline
+
+# ========== STREAMLIT RESULT CACHES ==========
+#
+# Every widget interaction reruns the whole app script. These caches key the
+# expensive stages on a content hash of the captured frame, so typing in a
+# text box or changing the date no longer re-runs the filters. Images are
+# passed as underscore arguments, which Streamlit leaves out of its own
+# argument hashing; the digest stands in for them. The filter backend name is
+# part of every filtered key. max_entries bounds memory: the least recently
+# used results are evicted first.
+#
+# On screen the apps only show filtered preview proxies (see
+# filters.preview_image); the full-resolution filter + encrypt + embed + PNG
+# export runs when the download is requested. It is keyed the same way, plus
+# a digest of the key (never the key itself) and the container format
+# version, so a format change can never serve an image in the old layout.
+
+FILTER_CACHE_ENTRIES = 32
+EMBED_CACHE_ENTRIES = 8
+
+
+# Content hash of an image's mode, size and pixels
+def image_digest(image):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.mode}:{image.size}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+# Stand-in for an encryption key in cache keys
+def key_digest(key):
+    return hashlib.blake2b(key, digest_size=16, person=b"stegocam-key").hexdigest()
+
+
+@metrics.timed("encode_png")
+def png_bytes(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES, show_spinner=False)
+def _filtered_image(digest, filter_option, backend, _img):
+    from . import filters
+
+    return filters.apply_filter(_img, filter_option)
+
+
+# Apply a filter, reusing the result from an earlier rerun when the frame and
+# filter are unchanged
+def cached_filter(img, filter_option, digest=None):
+    from . import filters
+
+    return _filtered_image(digest or image_digest(img), filter_option, filters.backend, img)
+
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES, show_spinner=False)
+def _preview(digest, filter_option, backend, max_side, _img):
+    from . import filters
+
+    preview, scale = filters.preview_image(_img, max_side)
+    return filters.apply_filter(preview, filter_option, scale)
+
+
+# Filtered, downscaled proxy of the frame for display; cheap to compute and to
+# send to the browser, and reused while the frame and filter are unchanged;
+# max_side defaults to filters.PREVIEW_SIZE
+def cached_preview(img, filter_option, digest=None, max_side=None):
+    from . import filters
+
+    max_side = max_side or filters.PREVIEW_SIZE
+    return _preview(digest or image_digest(img), filter_option, filters.backend, max_side, img)
+
+
+@st.cache_data(max_entries=EMBED_CACHE_ENTRIES, show_spinner=False)
+def _embedded_png(digest, filter_option, backend, data, key_id, cipher, version, _img, _key):
+    return png_bytes(pipeline.embed_message(_img, data.encode(), _key, cipher, filter_option))
+
+
+# Filter the full-resolution frame, encrypt `data` under `key`, embed it and
+# return the PNG bytes, reusing the result while the frame, filter, data, key
+# and format are unchanged; raises stego.CapacityError when it does not fit
+def cached_embed_png(img, filter_option, data, key, cipher=crypto.AES_GCM, digest=None):
+    from . import filters
+
+    return _embedded_png(
+        digest or image_digest(img), filter_option, filters.backend, data, key_digest(key), cipher,
+        container.VERSION, img, key,
+    )
+
+
+@st.cache_data(max_entries=EMBED_CACHE_ENTRIES, show_spinner=False)
+def _hidden_image_png(carrier_digest, hidden_digest, key_id, image_codec, quality, version, _carrier, _image, _key):
+    return png_bytes(pipeline.embed_image_stream(_carrier, _image, _key, image_codec, quality))
+
+
+# Hide `image` inside `carrier` (see pipeline.embed_image_stream) and return the
+# PNG bytes, reusing the result while both images, the key and the codec
+# settings are unchanged
+def cached_hidden_image_png(carrier, image, key, image_codec, quality, carrier_digest=None, digest=None):
+    return _hidden_image_png(
+        carrier_digest or image_digest(carrier), digest or image_digest(image), key_digest(key),
+        image_codec, quality, container.VERSION, carrier, image, key,
+    )
+
+
+# A generated secret that stays the same across reruns until `scope` (e.g. the
+# digest of the captured frame) changes
+def stable_secret(name, scope, generate):
+    scoped = st.session_state.get(name)
+    if scoped is None or scoped[0] != scope:
+        scoped = (scope, generate())
+        st.session_state[name] = scoped
+    return scoped[1]
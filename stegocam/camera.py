@@ -0,0 +1,106 @@
+import io
+import json
+import os
+import struct
+
+import streamlit as st
+import streamlit.components.v1 as components
+from PIL import Image
+
+from . import metrics
+
+# ========== CAMERA COMPONENT ==========
+#
+# A bidirectional Streamlit component (frontend/camera/index.html) showing a
+# live camera preview with a capture button. Captured frames come back as one
+# binary widget value instead of a base64 PNG data URL:
+#
+#   header length (>H) | JSON header | payload
+#
+# The header holds the format, width, height, capture profile and a capture
+# id. The payload is a JPEG or WebP blob encoded by the browser at the
+# requested quality, or the raw RGBA canvas pixels for format "raw" (no
+# encode/decode at all, at the cost of a payload of width * height * 4 bytes).
+#
+# A capture profile sets the resolution requested from getUserMedia and the
+# longest side the browser downscales the frame to on the canvas before
+# upload (None keeps the camera's full resolution), so only as many pixels
+# as the pipeline needs cross the network. The profile used comes back in the
+# frame header and ends up in the image's info["capture"].
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "camera")
+PACKET_HEADER = struct.Struct(">H")
+
+FORMATS = ("jpeg", "webp", "raw")
+DEFAULT_FORMAT = "jpeg"
+DEFAULT_QUALITY = 0.9
+
+PROFILES = {
+    "thumbnail": {"width": 640, "height": 480, "max_side": 640},
+    "hd": {"width": 1280, "height": 720, "max_side": 1280},
+    "max": {"width": 4096, "height": 2160, "max_side": None},
+}
+DEFAULT_PROFILE = "hd"
+
+_component = components.declare_component("stegocam_camera", path=FRONTEND_DIR)
+
+
+# Split a frame packet into its JSON header and payload
+def parse_packet(packet):
+    packet = memoryview(packet)
+    (size,) = PACKET_HEADER.unpack(packet[:PACKET_HEADER.size])
+    header = json.loads(bytes(packet[PACKET_HEADER.size:PACKET_HEADER.size + size]))
+    return header, packet[PACKET_HEADER.size + size:]
+
+
+# Decode a frame packet straight into an RGB uint8 array
+@metrics.timed("decode_frame")
+def decode_frame(packet):
+    import numpy as np  # not needed until the first capture
+
+    from . import filters
+
+    header, payload = parse_packet(packet)
+    if header["format"] == "raw":
+        rgba = np.frombuffer(payload, dtype=np.uint8).reshape(header["height"], header["width"], 4)
+        return header, np.ascontiguousarray(rgba[:, :, :3])
+
+    if filters.HAS_CV2:  # otherwise PIL decodes the frames
+        cv2 = filters.load_cv2()
+        bgr = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if bgr is not None:
+            return header, cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    with Image.open(io.BytesIO(payload)) as img:
+        return header, np.asarray(img.convert("RGB"))
+
+
+# Camera preview with a capture button; returns the last captured frame as an
+# RGB image, or None before the first capture. allow_switch adds front/back
+# camera buttons; profile picks the capture resolution (see PROFILES), and
+# image_format and quality control how the browser encodes the frame (see
+# FORMATS).
+def camera_input(facing_mode="user", allow_switch=False, profile=DEFAULT_PROFILE, image_format=DEFAULT_FORMAT,
+                 quality=DEFAULT_QUALITY, key=None):
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown capture profile {profile!r}; expected one of {sorted(PROFILES)}.")
+    if image_format not in FORMATS:
+        raise ValueError(f"Unknown frame format {image_format!r}; expected one of {FORMATS}.")
+    packet = _component(
+        facing_mode=facing_mode, allow_switch=allow_switch, profile=dict(PROFILES[profile], name=profile),
+        image_format=image_format, quality=quality, key=key, default=None,
+    )
+    if packet is None:
+        return None
+
+    # The component keeps returning its last capture on every rerun; only
+    # decode a frame the first time it is seen
+    memo_key = f"_stegocam_camera_{key or facing_mode + '_' + profile}"
+    header, _ = parse_packet(packet)
+    memo = st.session_state.get(memo_key)
+    if memo is None or memo[0] != header["id"]:
+        header, pixels = decode_frame(packet)
+        frame = Image.fromarray(pixels)
+        frame.info["capture"] = header
+        memo = (header["id"], frame)
+        st.session_state[memo_key] = memo
+    return memo[1]
@@ -0,0 +1,379 @@
+import argparse
+import collections
+import contextlib
+import glob
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image
+
+from . import codec, container, crypto, filters, pipeline, profiling, service, stego
+
+# ========== BATCH COMMAND LINE ==========
+#
+#   python -m stegocam embed   INPUT... --out DIR (--passcode P | --key K) --message TEXT
+#   python -m stegocam extract INPUT... (--passcode P | --key K) [--out DIR]
+#   python -m stegocam verify  INPUT... [--passcode P | --key K]
+#   python -m stegocam serve   [--host H] [--port P] [--workers N]   (see service.py)
+#   python -m stegocam hotspots DIR [--top N] [--tag T]... [--merge OUT]  (see profiling.py)
+#
+# An INPUT is a directory (walked recursively) or a glob pattern. Results
+# mirror the input tree under --out: relative to the directory, or to the
+# part of the pattern before its first wildcard. A result keeps the source
+# extension when it gets a different one (y.jpg -> y.jpg.png), and an input
+# whose result path an earlier input of the batch already wrote fails
+# instead of overwriting it. Paths are produced lazily and each file is
+# opened, processed, written and released on its own, so memory stays
+# bounded by one image per worker process (--workers, see run_batch) however
+# large the archive is. A failure on one file is reported and the batch
+# carries on; the exit status is 1 when any file failed. Throughput goes to stderr as the batch runs and as a summary
+# at the end.
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+PROGRESS_EVERY = 100
+
+
+# The directory part of a glob pattern before its first wildcard
+def glob_root(pattern):
+    root = os.path.dirname(pattern)
+    while glob.has_magic(root):
+        root = os.path.dirname(root)
+    return root or "."
+
+
+# Yield (input root, image path) for every image under the given directories
+# (in name order) and glob patterns, without listing everything up front
+def iter_images(inputs):
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for root, dirs, files in os.walk(pattern):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        yield pattern, os.path.join(root, name)
+        else:
+            root = glob_root(pattern)
+            for path in glob.iglob(pattern, recursive=True):
+                if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+                    yield root, path
+
+
+# Where the result for `path` goes: the same relative path under `out_dir`,
+# with the given extension replacing the source one when they match and
+# appended to it otherwise, so y.jpg and y.png never share a result
+def output_path(out_dir, root, path, extension):
+    relative = os.path.relpath(path, root)
+    stem, source_extension = os.path.splitext(relative)
+    if source_extension.lower() == extension.lower():
+        relative = stem
+    return os.path.join(out_dir, relative + extension)
+
+
+# Files, bytes and failures of a batch, reported as files/s and MB/s
+class Throughput:
+    def __init__(self, command, stream=sys.stderr, every=PROGRESS_EVERY):
+        self.command = command
+        self.stream = stream
+        self.every = every
+        self.files = self.failed = self.bytes = 0
+        self.start = time.perf_counter()
+
+    def update(self, size, ok=True):
+        self.files += 1
+        self.bytes += size
+        self.failed += not ok
+        if self.every and self.files % self.every == 0:
+            print(self.line(), file=self.stream, flush=True)
+
+    def line(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.command}: {self.files} files ({self.failed} failed), {self.bytes / 1e6:.1f} MB "
+                f"in {elapsed:.1f} s, {self.files / elapsed:.1f} files/s, {self.bytes / 1e6 / elapsed:.1f} MB/s")
+
+
+def _key(args):
+    if args.passcode:
+        return crypto.passcode_key(args.passcode)
+    return args.key.encode() if args.key else None
+
+
+# ---------- PER-FILE WORK ----------
+#
+# Each returns the line to print on stdout for the file (or None) and the
+# results it wrote through write_output, and raises on failure. They only
+# take paths, so they run unchanged in a worker process.
+
+STAGED_SUFFIX = ".partial"
+
+
+# Write a result to a temporary name next to `out` with write(staged path);
+# returns (staged, out) for run_batch to move into place (see _commit)
+def write_output(out, write):
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    staged = f"{out}.{os.getpid()}{STAGED_SUFFIX}"
+    try:
+        write(staged)
+    except Exception:
+        with contextlib.suppress(OSError):
+            os.remove(staged)
+        raise
+    return staged, out
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def embed_file(job, root, path):
+    with Image.open(path) as img:
+        embedded = pipeline.embed_message(img, job.data, job.secret, job.cipher, job.filter, job.bits)
+    out = output_path(job.out, root, path, ".png")
+    return None, [write_output(out, lambda staged: embedded.save(staged, format="PNG"))]
+
+
+def extract_file(job, root, path):
+    with Image.open(path) as img:
+        header, data = pipeline.extract_message(img, job.secret)
+    if header.codec != codec.NONE:
+        # A hidden image (dual-camera apps)
+        out = output_path(job.out or ".", root, path, ".hidden.png")
+        hidden = codec.decode_image(data, header.codec)
+        return None, [write_output(out, lambda staged: hidden.save(staged, format="PNG"))]
+    if job.out:
+        out = output_path(job.out, root, path, ".txt")
+        return None, [write_output(out, lambda staged: _write_bytes(staged, data))]
+    return f"{path}: {data.decode(errors='replace')}", []
+
+
+# Check the image holds an intact payload (header + checksum); with a key,
+# also check it decrypts. A legacy (v0) payload has no length or checksum,
+# so any image whose LSBs happen to hold an end marker would pass; it is
+# only accepted with a key.
+def verify_file(job, root, path):
+    with Image.open(path) as img:
+        header, encrypted_data = stego.read_container(img)
+    if encrypted_data is None:
+        raise ValueError("no intact payload")
+    if job.secret is None and header.version == 0:
+        raise ValueError("legacy (v0) payload has no checksum; verify it with --passcode or --key")
+    if job.secret is not None:
+        crypto.decrypt_bytes(encrypted_data, job.secret, header.cipher)
+    return f"OK   {path} (v{header.version}, {crypto.CIPHER_NAMES[header.cipher]}, {len(encrypted_data)} bytes)", []
+
+
+# ---------- PARALLEL BATCHES ----------
+#
+# With --workers > 1 files are spread over a ProcessPoolExecutor. Only paths
+# cross the process boundary: each worker opens its input and writes its
+# results itself, under a temporary name that run_batch moves into place,
+# and the job settings (key, message, ...) are handed to every worker once
+# by the pool initializer instead of with each file. At most
+# workers * PENDING_PER_WORKER files are in flight, so huge archives are
+# still consumed lazily, and results are collected in submission order, so
+# the output is the same for any worker count. An exception fails only its
+# own file. A worker that dies outright (OOM killer, a crash in a native
+# decoder) breaks the whole pool and every file in flight on it with it, so
+# those files are run again on a fresh pool one at a time: only a file that
+# breaks a pool on its own fails.
+
+PENDING_PER_WORKER = 4
+
+_job = None
+
+
+def _init_worker(job):
+    global _job
+    _job = job
+    # One process per core already; stop OpenCV spawning its own threads too
+    if filters.HAS_CV2:
+        filters.load_cv2().setNumThreads(1)
+
+
+# Run the job's per-file function on one (root, path); returns (path, size,
+# stdout line, error, staged results)
+def _process(item, job=None):
+    job = job or _job
+    root, path = item
+    size = 0
+    try:
+        size = os.path.getsize(path)
+        line, written = job.process(job, root, path)
+        return path, size, line, None, written
+    except Exception as e:  # wrong key, tampered, unreadable or too small
+        return path, size, None, str(e) or type(e).__name__, []
+
+
+# A ProcessPoolExecutor for the batch, with the files in flight on it as
+# [item, pool, future] in submission order; replaced when it breaks
+class _WorkerPool:
+    def __init__(self, job, workers):
+        self.job = job
+        self.workers = workers
+        self.pool = self._start()
+        self.pending = collections.deque()
+
+    def _start(self):
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.job,))
+
+    def submit(self, item):
+        try:
+            future = self.pool.submit(_process, item)
+        except BrokenProcessPool:
+            self._recover(self.pool)
+            future = self.pool.submit(_process, item)
+        self.pending.append([item, self.pool, future])
+
+    # The result of the oldest file in flight
+    def pop(self):
+        entry = self.pending[0]
+        try:
+            entry[2].result()
+        except BrokenProcessPool:
+            self._recover(entry[1])
+        return self.pending.popleft()[2].result()
+
+    # Replace the broken pool and rerun each of its files that did not
+    # finish alone on the new one; one that breaks that pool too fails
+    def _recover(self, broken):
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.pool = self._start()
+        for entry in self.pending:
+            item, pool, future = entry
+            if pool is not broken or not isinstance(future.exception(), BrokenProcessPool):
+                continue
+            try:
+                result = self.pool.submit(_process, item).result()
+            except BrokenProcessPool as e:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._start()
+                result = item[1], 0, None, str(e) or type(e).__name__, []
+            entry[1], entry[2] = None, Future()
+            entry[2].set_result(result)
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+# Move the staged results of one file into place and return its (path,
+# size, stdout line, error). Runs in input order, so when two inputs map to
+# the same result path the earlier one keeps it and the later one fails.
+def _commit(result, written_paths):
+    path, size, line, error, written = result
+    for _, out in written:
+        if error is None and os.path.abspath(out) in written_paths:
+            error = f"{out} is already written by another input"
+    for staged, out in written:
+        if error is None:
+            os.replace(staged, out)
+            written_paths.add(os.path.abspath(out))
+        else:
+            with contextlib.suppress(OSError):
+                os.remove(staged)
+    return path, size, line, error
+
+
+# Results of `job` over the input files, in input order
+def run_batch(job, workers=1):
+    items = iter_images(job.inputs)
+    written_paths = set()
+    if workers <= 1:
+        for item in items:
+            yield _commit(_process(item, job), written_paths)
+        return
+
+    pool = _WorkerPool(job, workers)
+    try:
+        for item in items:
+            pool.submit(item)
+            if len(pool.pending) >= workers * PENDING_PER_WORKER:
+                yield _commit(pool.pop(), written_paths)
+        while pool.pending:
+            yield _commit(pool.pop(), written_paths)
+    finally:
+        pool.shutdown()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="stegocam", description="Batch encrypt/embed and extract over image files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, help, process, key_required):
+        command = commands.add_parser(name, help=help)
+        command.add_argument("inputs", nargs="+", metavar="INPUT", help="image directory or glob pattern")
+        keys = command.add_mutually_exclusive_group(required=key_required)
+        keys.add_argument("--passcode", help="6-character passcode, as used by the apps")
+        keys.add_argument("--key", help="urlsafe-base64 Fernet key")
+        command.add_argument("--progress", type=int, default=PROGRESS_EVERY, metavar="N",
+                             help=f"report throughput every N files, 0 for only at the end (default: {PROGRESS_EVERY})")
+        command.add_argument("--workers", type=int, default=os.cpu_count() or 1, metavar="N",
+                             help="worker processes (default: one per CPU core)")
+        command.set_defaults(process=process)
+        return command
+
+    embed = add_command("embed", "encrypt a message and embed it into every image", embed_file, True)
+    embed.add_argument("--out", required=True, help="output directory for the PNG results")
+    message = embed.add_mutually_exclusive_group(required=True)
+    message.add_argument("--message", help="message text")
+    message.add_argument("--message-file", help="file whose bytes are the message")
+    embed.add_argument("--filter", default="None", choices=filters.FILTERS)
+    embed.add_argument("--cipher", default="aes-gcm", choices=sorted(crypto.CIPHERS))
+    embed.add_argument("--bits", type=int, default=1, choices=container.BIT_DEPTHS, help="LSBs per channel (default: 1)")
+
+    extract = add_command("extract", "extract and decrypt the message of every image", extract_file, True)
+    extract.add_argument("--out", help="write one file per image here instead of printing the messages")
+
+    add_command("verify", "check every image holds an intact payload", verify_file, False)
+
+    serve = commands.add_parser("serve", help="run the HTTP decrypt service (see stegocam.service)")
+    serve.add_argument("--host", default=service.DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=service.DEFAULT_PORT)
+    serve.add_argument("--workers", type=int, default=None, metavar="N",
+                       help="worker processes (default: one per CPU core)")
+
+    hotspots = commands.add_parser("hotspots", help="top-N report over per-rerun profiles (see stegocam.profiling)")
+    hotspots.add_argument("directory", help="STEGOCAM_PROFILE_DIR the apps wrote to")
+    hotspots.add_argument("--top", type=int, default=20)
+    hotspots.add_argument("--tag", action="append", default=[],
+                          help="only reruns whose file name contains this tag (e.g. app6, step2, decrypt); repeatable")
+    hotspots.add_argument("--exclude", metavar="REGEX", help="leave matching frames out of the tables")
+    hotspots.add_argument("--merge", metavar="OUT", help="also write the merged collapsed stacks, for a flame graph")
+    return parser
+
+
+def main(argv=None):
+    job = build_parser().parse_args(argv)
+    if job.command == "serve":
+        service.serve(job.host, job.port, job.workers)
+        return 0
+    if job.command == "hotspots":
+        stacks = profiling.report(job.directory, job.top, job.tag, job.exclude)
+        if job.merge:
+            with open(job.merge, "w") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        return 0 if stacks else 1
+
+    job.secret = _key(job)
+    if job.command == "embed":
+        if job.message_file:
+            with open(job.message_file, "rb") as f:
+                job.data = f.read()
+        else:
+            job.data = job.message.encode()
+
+    stats = Throughput(job.command, every=job.progress)
+    for path, size, line, error in run_batch(job, job.workers):
+        if error is None:
+            if line is not None:
+                print(line)
+        else:
+            print(f"FAIL {path}: {error}", file=sys.stderr)
+        stats.update(size, error is None)
+    print(stats.line(), file=sys.stderr)
+    if not stats.files:
+        print(f"No images found in {' '.join(job.inputs)}.", file=sys.stderr)
+    return 1 if stats.failed or not stats.files else 0
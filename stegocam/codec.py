@@ -0,0 +1,123 @@
+import io
+import lzma
+import struct
+import zlib
+
+from PIL import Image
+
+from . import metrics
+
+# ========== PAYLOAD CODECS ==========
+#
+# A hidden image is serialized by one of these codecs before it is encrypted,
+# and the codec id is recorded in the container header so the extractor knows
+# how to turn the decrypted bytes back into an image.
+#
+#   NONE  - payload is not an image, or is any format PIL can open directly
+#   PNG   - lossless PNG (what the apps originally embedded)
+#   WEBP  - lossy WebP at the given quality; by far the smallest
+#   JPEG  - lossy JPEG at the given quality
+#   ZLIB  - raw pixels, delta-coded along each row, deflated with zlib
+#   LZMA  - the same raw serialization compressed with LZMA (slower, smaller)
+#
+# The raw serialization is a small (mode, width, height) header followed by
+# each pixel's difference from its left neighbour, which turns smooth image
+# regions into runs of small values that the general-purpose compressors
+# handle well.
+
+NONE, PNG, WEBP, JPEG, ZLIB, LZMA = range(6)
+
+CODECS = {
+    "png": PNG,
+    "webp": WEBP,
+    "jpeg": JPEG,
+    "zlib": ZLIB,
+    "lzma": LZMA,
+}
+CODEC_NAMES = {codec: name for name, codec in CODECS.items()}
+
+LOSSY = (WEBP, JPEG)
+DEFAULT_QUALITY = 80
+
+RAW_HEADER = struct.Struct(">4sII")
+RAW_BAND_ROWS = 64
+
+
+def codec_id(codec):
+    if isinstance(codec, str):
+        try:
+            return CODECS[codec.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown codec {codec!r}; expected one of {sorted(CODECS)}.") from None
+    if codec not in (NONE, *CODECS.values()):
+        raise ValueError(f"Unknown codec id {codec}.")
+    return codec
+
+
+# Raw, row-delta serialization used by the ZLIB and LZMA codecs, produced a
+# band of rows at a time so it can be compressed as a stream
+def iter_raw(image):
+    import numpy as np  # the raw codecs are the only part that needs it
+
+    yield RAW_HEADER.pack(image.mode.encode().ljust(4), image.width, image.height)
+    for top in range(0, image.height, RAW_BAND_ROWS):
+        pixels = np.asarray(image.crop((0, top, image.width, min(top + RAW_BAND_ROWS, image.height))), dtype=np.uint8)
+        if pixels.ndim == 2:
+            pixels = pixels[:, :, None]
+        yield np.diff(pixels, axis=1, prepend=np.zeros_like(pixels[:, :1])).tobytes()
+
+
+def pack_raw(image):
+    return b"".join(iter_raw(image))
+
+
+def unpack_raw(data):
+    mode, width, height = RAW_HEADER.unpack(data[:RAW_HEADER.size])
+    mode = mode.rstrip().decode()
+    import numpy as np
+
+    deltas = np.frombuffer(data, dtype=np.uint8, offset=RAW_HEADER.size).reshape(height, width, -1)
+    pixels = np.cumsum(deltas, axis=1, dtype=np.uint8)
+    return Image.fromarray(pixels[:, :, 0] if mode == 'L' else pixels, mode)
+
+
+# Serialize an image with the given codec (name or id) into a writable file
+# object; the encoders write as they go, so `fp` can be a streaming encryptor
+def write_image(image, fp, codec=PNG, quality=DEFAULT_QUALITY):
+    codec = codec_id(codec)
+    if image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGB')
+
+    if codec in (ZLIB, LZMA):
+        compressor = zlib.compressobj(6) if codec == ZLIB else lzma.LZMACompressor(preset=6)
+        for chunk in iter_raw(image):
+            fp.write(compressor.compress(chunk))
+        fp.write(compressor.flush())
+    elif codec == WEBP:
+        image.save(fp, format='WEBP', quality=quality, method=4)
+    elif codec == JPEG:
+        if image.mode == 'RGBA':
+            image = image.convert('RGB')
+        image.save(fp, format='JPEG', quality=quality, optimize=True)
+    else:
+        image.save(fp, format='PNG')
+
+
+# Serialize an image with the given codec (name or id) into bytes
+def encode_image(image, codec=PNG, quality=DEFAULT_QUALITY):
+    buffer = io.BytesIO()
+    write_image(image, buffer, codec, quality)
+    return buffer.getvalue()
+
+
+# Turn decrypted payload bytes back into an image
+@metrics.timed("decode_image")
+def decode_image(data, codec=NONE):
+    codec = codec_id(codec)
+    if codec == ZLIB:
+        return unpack_raw(zlib.decompress(data))
+    if codec == LZMA:
+        return unpack_raw(lzma.decompress(data))
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
@@ -0,0 +1,64 @@
+import struct
+import zlib
+from collections import namedtuple
+
+# ========== STEGO CONTAINER HEADER ==========
+#
+# Every embedded payload starts with a header written into bit 0 of the RGB
+# channels of the first pixels of the image:
+#
+#   magic (4s) | version (B) | bits (B) | channels (B) | codec (B) |
+#   cipher (B) | length (I) | checksum (I)
+#
+# length and checksum (CRC-32) let the extractor read exactly the payload and
+# reject images that were re-encoded lossily or edited. bits is the payload
+# bit depth (1, 2 or 4 LSBs per channel) and channels is 4 when the alpha
+# channel carries data. codec is how the payload was serialized before
+# encryption (see codec.py) and cipher how it was encrypted (see crypto.py).
+
+MAGIC = b"STGC"
+VERSION = 1
+
+HEADER = struct.Struct(">4sBBBBBII")
+HEADER_SIZE = HEADER.size
+
+BIT_DEPTHS = (1, 2, 4)
+
+Header = namedtuple("Header", ["version", "bits", "channels", "codec", "cipher", "length", "checksum"])
+
+# Stand-in header for images made before the container existed: a Fernet
+# token terminated by the end marker (version 0, length/checksum unknown)
+LEGACY = Header(0, bits=1, channels=3, codec=0, cipher=0, length=None, checksum=None)
+
+
+def checksum(payload):
+    return zlib.crc32(payload) & 0xFFFFFFFF
+
+
+# Running CRC-32 for payloads that are checksummed piece by piece
+def checksum_update(chunk, crc=0):
+    return zlib.crc32(chunk, crc) & 0xFFFFFFFF
+
+
+# Build the header bytes for a payload of `length` bytes with CRC-32 `crc`
+# (the payload itself may have been streamed and never held in one piece)
+def pack_header(length, crc, bits=1, channels=3, codec=0, cipher=0):
+    if bits not in BIT_DEPTHS:
+        raise ValueError(f"Unsupported bit depth {bits}; expected one of {BIT_DEPTHS}.")
+    if channels not in (3, 4):
+        raise ValueError(f"Unsupported channel count {channels}; expected 3 (RGB) or 4 (RGBA).")
+    return HEADER.pack(MAGIC, VERSION, bits, channels, codec, cipher, length, crc)
+
+
+# Parse header bytes; returns None when they are not a container header
+# (e.g. a legacy delimiter-terminated image) or the version is unknown
+def unpack_header(data):
+    if len(data) < HEADER_SIZE:
+        return None
+    magic, version, *fields = HEADER.unpack(data[:HEADER_SIZE])
+    if magic != MAGIC or version != VERSION:
+        return None
+    header = Header(version, *fields)
+    if header.bits not in BIT_DEPTHS or header.channels not in (3, 4):
+        return None
+    return header
@@ -0,0 +1,315 @@
+import functools
+import importlib.util
+import os
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from . import metrics
+
+# OpenCV is only imported when the OpenCV backend first runs (see load_cv2);
+# the PIL backend still works without it
+HAS_CV2 = importlib.util.find_spec("cv2") is not None
+cv2 = None
+
+# ========== PHOTO FILTERS ==========
+#
+# Filters are declared once, in the registry below, as chains of operations:
+#
+#   color    - a fused affine colour map plus optional tone curve (a point op)
+#   kernel   - a 3x3 convolution
+#   gaussian - a Gaussian blur whose radius follows the preview scale
+#
+# Each operation carries a per-pixel cost estimate. compile_filter turns a
+# chain into the sequence that actually runs: cheap ops are moved ahead of
+# expensive ones where the two commute, and adjacent colour ops are fused into
+# one pass. Compiled chains are cached per filter name.
+#
+# Two interchangeable backends execute compiled chains:
+#
+#   pil    - ImageFilter kernels, with colour ops done by Image.convert's
+#            matrix mode
+#   opencv - OpenCV/NumPy on one uint8 array, modified in place wherever the
+#            operation allows it
+#
+# The backend is picked once at startup from the STEGOCAM_FILTER_BACKEND
+# environment variable ("pil" or "opencv"); by default OpenCV is used when it
+# is installed. benchmarks/check_filter_parity.py checks that both produce
+# the same images within a small tolerance.
+
+# Filter names in menu order; register_filter appends to it
+FILTERS = []
+
+# Longest side of the on-screen preview. The filters run on a proxy this size
+# while the user browses; the full-resolution frame is only filtered on export.
+PREVIEW_SIZE = 800
+
+
+# Downscaled copy of the image for on-screen display, and the factor it was
+# scaled by (1.0 when it is already small enough)
+def preview_image(img, max_side=PREVIEW_SIZE):
+    scale = min(max_side / max(img.size), 1.0)
+    if scale == 1.0:
+        return img.copy(), scale
+    size = (max(round(img.width * scale), 1), max(round(img.height * scale), 1))
+    return img.resize(size, Image.Resampling.BILINEAR, reducing_gap=1.0), scale
+
+
+# ---------- Colour adjustments ----------
+#
+# Saturation (ImageEnhance.Color), brightness and per-channel gains or offsets
+# are all affine maps of a pixel's RGB vector, so any chain of them folds into
+# one 3x4 matrix and runs as a single pass over the pixels instead of one
+# full-image pass per step. An optional tone curve (a 256-entry table applied
+# to every channel) follows the matrix.
+
+LUMA = (0.299, 0.587, 0.114)  # ITU-R 601-2 weights, as in PIL's convert("L")
+
+ColorAdjustment = namedtuple("ColorAdjustment", ["matrix", "curve"])
+
+
+def _affine(linear, offset=(0, 0, 0)):
+    return np.hstack([np.asarray(linear, dtype=np.float64), np.asarray(offset, dtype=np.float64)[:, None]])
+
+
+# ImageEnhance.Color(factor): blend each pixel with its luma
+def saturation(factor):
+    return _affine(factor * np.eye(3) + (1 - factor) * np.outer(np.ones(3), LUMA))
+
+
+# convert("L").convert("RGB"): every channel becomes the luma
+def grayscale():
+    return _affine(np.outer(np.ones(3), LUMA))
+
+
+# ImageEnhance.Brightness(factor): blend each pixel with black
+def brightness(factor):
+    return _affine(factor * np.eye(3))
+
+
+# Per-channel gain and offset, e.g. channel_gain((1.1, 1.0, 0.9)) for a warm tint
+def channel_gain(gains, offsets=(0, 0, 0)):
+    return _affine(np.diag(gains), offsets)
+
+
+# Fold affine steps, applied first to last, into one 3x4 matrix
+def fuse(*steps):
+    fused = _affine(np.eye(3))
+    for step in steps:
+        fused = step[:, :3] @ fused + _affine(np.zeros((3, 3)), step[:, 3])
+    return fused
+
+
+def color_adjustment(*steps, curve=None):
+    if curve is not None:
+        curve = np.asarray(curve, dtype=np.uint8).reshape(256)
+    return ColorAdjustment(fuse(*steps).astype(np.float32), curve)
+
+
+# ---------- Operations ----------
+
+# Relative per-pixel cost estimates, used to order commuting ops
+COLOR_COST = 1
+KERNEL_COST = 9
+GAUSSIAN_COST = 25
+
+# The 3x3 kernels behind ImageFilter.SMOOTH and ImageFilter.SHARPEN
+SMOOTH_KERNEL = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13
+SHARPEN_KERNEL = np.array([[-2, -2, -2], [-2, 32, -2], [-2, -2, -2]], dtype=np.float32) / 16
+
+# linear marks ops that are linear in the pixel values and never leave the
+# 0-255 range, so no clipping happens in them; any two such ops commute
+# (up to rounding) and may be reordered
+Op = namedtuple("Op", ["kind", "args", "cost", "linear"])
+
+
+def color_op(*steps, curve=None):
+    adjustment = color_adjustment(*steps, curve=curve)
+    return Op("color", adjustment, COLOR_COST, curve is None and _preserves_range(adjustment.matrix))
+
+
+def kernel_op(kernel):
+    kernel = np.asarray(kernel, dtype=np.float32)
+    return Op("kernel", kernel, KERNEL_COST, bool((kernel >= 0).all() and abs(kernel.sum() - 1) < 1e-6))
+
+
+def gaussian_op(radius):
+    return Op("gaussian", radius, GAUSSIAN_COST, True)
+
+
+# True when the affine map sends every RGB value in the 0-255 cube back into it
+def _preserves_range(matrix):
+    corners = np.array([[r, g, b, 1] for r in (0, 255) for g in (0, 255) for b in (0, 255)], dtype=np.float64)
+    mapped = corners @ np.asarray(matrix, dtype=np.float64).T
+    return bool((mapped >= -1e-3).all() and (mapped <= 255 + 1e-3).all())
+
+
+# Two colour ops fold into one when the first neither clips nor has a curve
+def _fuse_ops(first, second):
+    adjustment = ColorAdjustment(
+        fuse(first.args.matrix, second.args.matrix).astype(np.float32), second.args.curve
+    )
+    return Op("color", adjustment, COLOR_COST, first.linear and second.linear)
+
+
+# ---------- Registry ----------
+
+FILTER_REGISTRY = {}
+
+
+# Declare a named filter as a chain of ops, applied first to last
+def register_filter(name, *ops):
+    if name not in FILTER_REGISTRY:
+        FILTERS.append(name)
+    FILTER_REGISTRY[name] = ops
+    compile_filter.cache_clear()
+
+
+# The chain that actually runs for a filter: a stable sort that moves each op
+# ahead of costlier ones it commutes with, then adjacent colour ops fused
+@functools.lru_cache(maxsize=None)
+def compile_filter(name):
+    if name not in FILTER_REGISTRY:
+        raise ValueError(f"Unknown filter {name!r}; expected one of {FILTERS}.")
+
+    ordered = []
+    for op in FILTER_REGISTRY[name]:
+        position = len(ordered)
+        while position and op.linear and ordered[position - 1].linear and ordered[position - 1].cost > op.cost:
+            position -= 1
+        ordered.insert(position, op)
+
+    compiled = []
+    for op in ordered:
+        previous = compiled[-1] if compiled else None
+        if (previous is not None and previous.kind == op.kind == "color"
+                and previous.linear and previous.args.curve is None):
+            compiled[-1] = _fuse_ops(previous, op)
+        else:
+            compiled.append(op)
+    return tuple(compiled)
+
+
+# Total estimated per-pixel cost of a compiled filter
+def filter_cost(name):
+    return sum(op.cost for op in compile_filter(name))
+
+
+register_filter("None")
+register_filter("Black & White", color_op(grayscale()))
+register_filter("Vintage", kernel_op(SMOOTH_KERNEL), color_op(saturation(0.7)), color_op(brightness(0.9)))
+register_filter("Blur", gaussian_op(2))
+register_filter("Sharp", kernel_op(SHARPEN_KERNEL))
+register_filter("Warm", color_op(saturation(1.5)))
+register_filter("Cool", color_op(saturation(0.5)))
+
+
+# ---------- PIL backend ----------
+
+def _pil_color(img, adjustment):
+    alpha = img.getchannel("A") if img.mode == "RGBA" else None
+    rgb = img if img.mode == "RGB" else img.convert("RGB")
+    adjusted = rgb.convert("RGB", tuple(adjustment.matrix.reshape(-1).tolist()))
+    if adjustment.curve is not None:
+        adjusted = adjusted.point(adjustment.curve.tolist() * 3)
+    if alpha is not None:
+        adjusted.putalpha(alpha)
+    return adjusted
+
+
+def _pil_filter(img, filter_option, scale=1.0):
+    filtered_img = img
+    for op in compile_filter(filter_option):
+        if op.kind == "color":
+            filtered_img = _pil_color(filtered_img, op.args)
+        elif op.kind == "kernel":
+            filtered_img = filtered_img.filter(ImageFilter.Kernel((3, 3), op.args.reshape(-1).tolist(), scale=1))
+        else:
+            filtered_img = filtered_img.filter(ImageFilter.GaussianBlur(radius=op.args * scale))
+    return img.copy() if filtered_img is img else filtered_img
+
+
+# ---------- OpenCV backend ----------
+
+# Import OpenCV on first use, which keeps it out of the apps' start-up
+def load_cv2():
+    global cv2
+    if cv2 is None:
+        import cv2
+    return cv2
+
+
+# Run a compiled filter over an RGB uint8 array in place
+def _cv_run(rgb, ops, scale=1.0):
+    load_cv2()
+    for op in ops:
+        if op.kind == "color":
+            # One cv2.transform pass for the fused matrix, plus a table lookup
+            # when there is a tone curve
+            cv2.transform(rgb, op.args.matrix, dst=rgb)
+            if op.args.curve is not None:
+                cv2.LUT(rgb, op.args.curve, dst=rgb)
+        elif op.kind == "kernel":
+            cv2.filter2D(rgb, -1, op.args, dst=rgb, borderType=cv2.BORDER_REPLICATE)
+        else:
+            cv2.GaussianBlur(rgb, (0, 0), op.args * scale, dst=rgb, borderType=cv2.BORDER_REPLICATE)
+
+
+def _cv_filter(img, filter_option, scale=1.0):
+    ops = compile_filter(filter_option)
+    if not ops:
+        return img.copy()
+
+    # Alpha is carried over untouched; the filters only change colour
+    alpha = img.getchannel("A") if img.mode == "RGBA" else None
+    rgb = np.array(img if img.mode == "RGB" else img.convert("RGB"), dtype=np.uint8)  # the one full-size copy
+    _cv_run(rgb, ops, scale)
+
+    filtered_img = Image.fromarray(rgb, "RGB")
+    if alpha is not None:
+        filtered_img.putalpha(alpha)
+    return filtered_img
+
+
+BACKENDS = {"pil": _pil_filter}
+if HAS_CV2:
+    BACKENDS["opencv"] = _cv_filter
+
+BACKEND_ENV = "STEGOCAM_FILTER_BACKEND"
+backend = None
+_apply = None
+
+
+# Switch the filter backend; raises ValueError for unknown or unavailable ones
+def select_backend(name):
+    global backend, _apply
+    name = name.lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Filter backend {name!r} is not available; expected one of {sorted(BACKENDS)}.")
+    backend, _apply = name, BACKENDS[name]
+
+
+select_backend(os.environ.get(BACKEND_ENV) or ("opencv" if "opencv" in BACKENDS else "pil"))
+
+
+# Apply one of FILTERS to an image with the selected backend; always returns a
+# new image. `scale` is the size of the image relative to the original frame,
+# so radius-based filters look the same on a preview proxy as on the
+# full-resolution export.
+def apply_filter(img, filter_option, scale=1.0):
+    with metrics.span(f"filter:{filter_option}"):
+        return _apply(img, filter_option, scale)
+
+
+# Apply one of FILTERS to an RGB uint8 array (e.g. a video frame) and return
+# the filtered array. The OpenCV backend filters a writable array in place with
+# no image objects in between; the PIL backend goes through an image.
+def filter_array(rgb, filter_option, scale=1.0):
+    with metrics.span(f"filter:{filter_option}"):
+        if backend == "opencv":
+            if not rgb.flags.writeable:
+                rgb = rgb.copy()
+            _cv_run(rgb, compile_filter(filter_option), scale)
+            return rgb
+        return np.asarray(_apply(Image.fromarray(rgb), filter_option, scale))
@@ -0,0 +1,179 @@
+import collections
+import threading
+
+import av
+import streamlit as st
+from PIL import Image
+from streamlit_webrtc import WebRtcMode, webrtc_streamer
+
+from . import filters, metrics, video
+
+# ========== LIVE FILTERED PREVIEW ==========
+#
+# A streamlit-webrtc stream whose video runs through the filter engine frame
+# by frame, on streamlit-webrtc's worker thread rather than in a script rerun.
+# Frames that arrive while the previous one is still being filtered queue up;
+# the worker hands them all to LiveFilter.recv_queued, which filters only the
+# newest and drops the rest, so the preview never falls further behind than
+# one frame's processing time.
+#
+# The newest camera frame is kept unfiltered, so a snapshot can go through
+# the normal capture flow, where the same filter is applied to it again.
+
+MEDIA_CONSTRAINTS = {
+    "video": {"width": {"ideal": 1280}, "height": {"ideal": 720}},
+    "audio": False,
+}
+
+
+# Per-session frame processor; the selected filter is read and the newest
+# frame written from different threads, so both sit behind a lock
+class LiveFilter:
+    def __init__(self, filter_option="None"):
+        self._lock = threading.Lock()
+        self._filter_option = filter_option
+        self._latest = None
+        self.processed = 0
+        self.dropped = 0
+
+    def set_filter(self, filter_option):
+        with self._lock:
+            self._filter_option = filter_option
+
+    async def recv_queued(self, frames):
+        frame = frames[-1]
+        rgb = frame.to_ndarray(format="rgb24")
+        with self._lock:
+            filter_option = self._filter_option
+            self._latest = rgb
+            self.processed += 1
+            self.dropped += len(frames) - 1
+        metrics.count("live_frames_processed")
+        metrics.count("live_frames_dropped", len(frames) - 1)
+
+        filtered = filters.filter_array(rgb.copy(), filter_option)
+        out = av.VideoFrame.from_ndarray(filtered, format="rgb24")
+        out.pts, out.time_base = frame.pts, frame.time_base
+        return [out]
+
+    # The newest unfiltered camera frame as an image, or None before the first
+    def snapshot(self):
+        with self._lock:
+            latest = self._latest
+        return None if latest is None else Image.fromarray(latest)
+
+
+# Live camera preview with `filter_option` applied to every frame and a
+# snapshot button; returns the last snapshot (unfiltered), or None
+def live_filtered_camera(filter_option, key="live_camera"):
+    processor_key, snapshot_key = f"_{key}_processor", f"_{key}_snapshot"
+    if processor_key not in st.session_state:
+        st.session_state[processor_key] = LiveFilter(filter_option)
+    processor = st.session_state[processor_key]
+    processor.set_filter(filter_option)
+
+    ctx = webrtc_streamer(
+        key=key,
+        mode=WebRtcMode.SENDRECV,
+        media_stream_constraints=MEDIA_CONSTRAINTS,
+        queued_video_frames_callback=processor.recv_queued,
+        async_processing=True,
+    )
+
+    if st.button("📸 Take Snapshot", key=f"{key}_snap", disabled=not ctx.state.playing):
+        snapshot = processor.snapshot()
+        if snapshot is None:
+            st.warning("No frame received from the camera yet.")
+        else:
+            st.session_state[snapshot_key] = snapshot
+    return st.session_state.get(snapshot_key)
+
+
+# ========== LIVE STEGANOGRAPHIC STREAM ==========
+#
+# The same kind of stream, with an encrypted message embedded into every
+# outgoing frame by video.VideoEmbedder (segment i of N in frame i mod N).
+# What the browser gets back is re-encoded by WebRTC's lossy video codec, so
+# the processor also keeps the last N embedded frames - one full message
+# cycle - as raw arrays in a ring. Nothing is encoded while the stream runs;
+# the ring is only zipped as PNGs (video.zip_frames) when it is downloaded,
+# so memory stays at N frames per session however long the stream runs.
+
+
+# Per-session frame processor; the embedder is built on the worker thread
+# from the first frame, once the camera's frame size is known
+class LiveEmbedder:
+    def __init__(self, encrypted_data, cipher, count=video.DEFAULT_SEGMENTS):
+        self._lock = threading.Lock()
+        self._message = (bytes(encrypted_data), cipher, count)
+        self._embedder = None
+        self._ring = collections.deque(maxlen=count)
+        self.error = None
+        self.processed = 0
+        self.dropped = 0
+
+    def set_message(self, encrypted_data, cipher, count=video.DEFAULT_SEGMENTS):
+        message = (bytes(encrypted_data), cipher, count)
+        with self._lock:
+            if message != self._message:
+                self._message, self._embedder = message, None
+                self._ring.clear()
+
+    async def recv_queued(self, frames):
+        frame = frames[-1]
+        rgb = frame.to_ndarray(format="rgb24")
+        with self._lock:
+            self.processed += 1
+            self.dropped += len(frames) - 1
+            embedder = self._embedder
+            if embedder is None or embedder.frame_size != (frame.width, frame.height):
+                encrypted_data, cipher, count = self._message
+                try:
+                    embedder = video.VideoEmbedder(encrypted_data, (frame.width, frame.height), count,
+                                                   cipher=cipher)
+                    self.error = None
+                    self._ring = collections.deque(maxlen=embedder.count)
+                except Exception as e:  # e.g. a frame too small for a segment
+                    embedder, self.error = None, e
+                self._embedder = embedder
+        metrics.count("live_stego_frames_processed")
+        metrics.count("live_stego_frames_dropped", len(frames) - 1)
+
+        if embedder is not None:
+            with metrics.span("embed_video_frame"):
+                embedder.embed(rgb)
+            with self._lock:
+                self._ring.append(rgb.copy())
+        out = av.VideoFrame.from_ndarray(rgb, format="rgb24")
+        out.pts, out.time_base = frame.pts, frame.time_base
+        return [out]
+
+    # True once the ring holds a full message cycle
+    def complete(self):
+        with self._lock:
+            return self._embedder is not None and len(self._ring) == self._ring.maxlen
+
+    # The last message cycle as a zip of PNG frames (see video.zip_frames)
+    def zip_recording(self):
+        with self._lock:
+            frames = list(self._ring)
+        return video.zip_frames(frames)
+
+
+# Live camera stream carrying `encrypted_data` in every frame; returns
+# (webrtc context, processor)
+def live_embedding_stream(encrypted_data, cipher, count=video.DEFAULT_SEGMENTS, key="live_stego"):
+    processor_key = f"_{key}_processor"
+    if processor_key not in st.session_state:
+        st.session_state[processor_key] = LiveEmbedder(encrypted_data, cipher, count)
+    processor = st.session_state[processor_key]
+    processor.set_message(encrypted_data, cipher, count)
+
+    ctx = webrtc_streamer(
+        key=key,
+        mode=WebRtcMode.SENDRECV,
+        media_stream_constraints=MEDIA_CONSTRAINTS,
+        queued_video_frames_callback=processor.recv_queued,
+        async_processing=True,
+    )
+    return ctx, processor
@@ -0,0 +1,207 @@
+import collections
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# ========== STAGE METRICS ==========
+#
+# Spans time the pipeline stages (decode, filter, encrypt, embed, extract,
+# PNG encode, ...) and counters count events, so a slow step can be pinned
+# on the stage that causes it. Both are off unless STEGOCAM_METRICS is set:
+#
+#   STEGOCAM_METRICS=1        time every span
+#   STEGOCAM_METRICS=memory   also record each span's peak traced allocation
+#                             (tracemalloc; Python objects and numpy arrays,
+#                             at a real cost in speed)
+#
+# Disabled, span() hands back one shared no-op context manager and timed()
+# returns the function undecorated, so the instrumentation costs next to
+# nothing. Totals are per process and can be shown in the apps' debug
+# sidebar (see sidebar) or exported as Prometheus text or JSON lines.
+
+METRICS_ENV = "STEGOCAM_METRICS"
+RECENT_SPANS = 200
+
+_mode = os.environ.get(METRICS_ENV, "").strip().lower()
+enabled = _mode not in ("", "0", "false", "off")
+trace_memory = enabled and _mode == "memory"
+
+_lock = threading.Lock()
+_local = threading.local()
+_spans = {}
+_counters = collections.Counter()
+recent = collections.deque(maxlen=RECENT_SPANS)
+
+if trace_memory and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, name):
+        self.name = name
+        self.peak = 0
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        if trace_memory:
+            # Peaks are relative to what was allocated on entry. An inner
+            # span resets the peak, so the outer one keeps its peak so far,
+            # and the inner one hands its own peak up on exit.
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak - stack[-1].base)
+            self.base = current
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        stack = _local.stack
+        stack.pop()
+        if trace_memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1] - self.base)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak + self.base - stack[-1].base)
+        _record(self.name, seconds, self.peak, exc[0] is not None)
+        return False
+
+
+def _record(name, seconds, peak, failed):
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = {"count": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0, "peak_bytes": 0}
+        stats["count"] += 1
+        stats["errors"] += failed
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        stats["peak_bytes"] = max(stats["peak_bytes"], peak)
+        recent.append({"time": time.time(), "span": name, "seconds": seconds, "peak_bytes": peak,
+                       "error": failed})
+
+
+# Context manager timing the block as span `name`
+def span(name):
+    return _Span(name) if enabled else _NULL_SPAN
+
+
+# Decorator timing every call of a function as span `name`
+def timed(name):
+    def decorate(func):
+        if not enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    if enabled:
+        with _lock:
+            _counters[name] += n
+
+
+# Copy of the totals: ({span: stats}, {counter: value})
+def snapshot():
+    with _lock:
+        return {name: dict(stats) for name, stats in _spans.items()}, dict(_counters)
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        recent.clear()
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Totals in the Prometheus text exposition format
+def prometheus_text():
+    spans, counters = snapshot()
+    lines = [
+        "# HELP stegocam_span_seconds Time spent in each pipeline stage.",
+        "# TYPE stegocam_span_seconds summary",
+    ]
+    for name, stats in sorted(spans.items()):
+        lines.append(f'stegocam_span_seconds_count{{span="{_label(name)}"}} {stats["count"]}')
+        lines.append(f'stegocam_span_seconds_sum{{span="{_label(name)}"}} {stats["seconds"]:.6f}')
+    lines += ["# HELP stegocam_span_max_seconds Slowest single run of each stage.",
+              "# TYPE stegocam_span_max_seconds gauge"]
+    lines += [f'stegocam_span_max_seconds{{span="{_label(name)}"}} {stats["max_seconds"]:.6f}'
+              for name, stats in sorted(spans.items())]
+    lines += ["# HELP stegocam_span_errors_total Stage runs that raised.",
+              "# TYPE stegocam_span_errors_total counter"]
+    lines += [f'stegocam_span_errors_total{{span="{_label(name)}"}} {stats["errors"]}'
+              for name, stats in sorted(spans.items())]
+    if trace_memory:
+        lines += ["# HELP stegocam_span_peak_bytes Largest traced allocation peak of each stage.",
+                  "# TYPE stegocam_span_peak_bytes gauge"]
+        lines += [f'stegocam_span_peak_bytes{{span="{_label(name)}"}} {stats["peak_bytes"]}'
+                  for name, stats in sorted(spans.items())]
+    lines += ["# HELP stegocam_events_total Counted events.", "# TYPE stegocam_events_total counter"]
+    lines += [f'stegocam_events_total{{name="{_label(name)}"}} {value}' for name, value in sorted(counters.items())]
+    return "\n".join(lines) + "\n"
+
+
+# The recent span runs, one JSON object per line, followed by the counters
+def json_lines():
+    with _lock:
+        events = list(recent)
+        counters = dict(_counters)
+    lines = [json.dumps(event) for event in events]
+    lines.append(json.dumps({"time": time.time(), "counters": counters}))
+    return "\n".join(lines) + "\n"
+
+
+# Debug panel in the Streamlit sidebar with the totals and exports; does
+# nothing unless metrics are enabled
+def sidebar():
+    if not enabled:
+        return
+    import streamlit as st
+
+    spans, counters = snapshot()
+    with st.sidebar.expander("⏱️ Stage metrics", expanded=False):
+        rows = [
+            {"span": name, "count": stats["count"], "total ms": round(stats["seconds"] * 1000, 1),
+             "mean ms": round(stats["seconds"] * 1000 / stats["count"], 1),
+             "max ms": round(stats["max_seconds"] * 1000, 1),
+             **({"peak MB": round(stats["peak_bytes"] / 1e6, 1)} if trace_memory else {})}
+            for name, stats in sorted(spans.items(), key=lambda item: -item[1]["seconds"])
+        ]
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        else:
+            st.caption("No spans recorded yet.")
+        for name, value in sorted(counters.items()):
+            st.caption(f"{name}: {value}")
+        st.download_button("Prometheus", prometheus_text, file_name="stegocam-metrics.prom", mime="text/plain")
+        st.download_button("JSON lines", json_lines, file_name="stegocam-metrics.jsonl", mime="application/x-ndjson")
+        if st.button("Reset metrics"):
+            reset()
+            st.rerun()
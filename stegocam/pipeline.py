@@ -0,0 +1,53 @@
+from . import codec, crypto, metrics
+
+# ========== STREAMING ENCRYPT + EMBED ==========
+#
+# Serialize an image, encrypt it and write it into the LSBs of a carrier in a
+# single pass: the image encoder writes into a StreamEncryptor, which hands
+# each sealed segment straight to a PayloadWriter. Besides the two images,
+# peak memory is one encoder buffer plus one 64 KiB segment, however large
+# the hidden image is.
+
+
+# Hide `image` inside `carrier`, encrypted under `key`; returns the new image
+# and raises stego.CapacityError when it does not fit
+@metrics.timed("embed_image")
+def embed_image_stream(carrier, image, key, image_codec=codec.WEBP, quality=codec.DEFAULT_QUALITY,
+                       bits=None, use_alpha=False):
+    from . import stego
+
+    writer = stego.PayloadWriter(carrier, bits, use_alpha, codec.codec_id(image_codec), crypto.AES_GCM_STREAM)
+    with crypto.StreamEncryptor(key, writer.write) as encryptor:
+        codec.write_image(image, encryptor, image_codec, quality)
+    return writer.finish()
+
+
+# ========== MESSAGES ==========
+
+
+# The metadata line the selfie apps embed, from a date, a time and a message
+def metadata_text(date, time, message):
+    return f"Date: {date.strftime('%Y-%m-%d')} | Time: {time.strftime('%H:%M:%S')} | Message: {message}"
+
+
+# Filter an image, encrypt `data` (bytes) under `key` and embed it; returns
+# the new image and raises stego.CapacityError when it does not fit
+def embed_message(image, data, key, cipher=crypto.AES_GCM, filter_option="None", bits=1):
+    from . import filters, stego
+
+    cipher = crypto.cipher_id(cipher)
+    encrypted_data = crypto.encrypt_bytes(data, key, cipher)
+    filtered = filters.apply_filter(image, filter_option)
+    return stego.embed_data_in_image(filtered, encrypted_data, bits=bits, cipher=cipher)
+
+
+# Extract and decrypt the payload of an image; returns (header, plaintext).
+# Raises ValueError when the image holds no valid payload, and the cipher's
+# own exception on a wrong key or tampered data.
+def extract_message(image, key):
+    from . import stego
+
+    header, encrypted_data = stego.read_container(image)
+    if encrypted_data is None:
+        raise ValueError("No embedded data found, or the image was modified after embedding.")
+    return header, crypto.decrypt_bytes(encrypted_data, key, header.cipher)
@@ -0,0 +1,215 @@
+import collections
+import os
+import re
+import sys
+import threading
+import time
+
+# ========== PER-RERUN PROFILING ==========
+#
+# With STEGOCAM_PROFILE_DIR set, every script rerun of an app is profiled by
+# a sampling profiler: a background thread takes the stack of the script
+# thread every STEGOCAM_PROFILE_INTERVAL_MS (default 5) milliseconds, and the
+# samples are written as one collapsed-stack file per rerun:
+#
+#   <dir>/<app>[-<tag>...]-<epoch ms>-<pid>.collapsed
+#
+# with one "frame;frame;...;leaf count" line per distinct stack, root first
+# - the format py-spy's raw output, flamegraph.pl and speedscope all read.
+# Frames are "function (file:first line)". The apps call begin() at the top,
+# tag() where the rerun takes a notable path (a step, the decrypt button)
+# and end() at the bottom. A rerun that never reaches end() (an exception,
+# st.rerun, st.stop) is written with an "interrupted" tag by its own sampler
+# once the script thread has exited, or by the next begin() on the same
+# thread if that comes first.
+#
+# `python -m stegocam hotspots DIR` aggregates the files (see report).
+# Disabled, begin/tag/end return immediately.
+
+PROFILE_ENV = "STEGOCAM_PROFILE_DIR"
+INTERVAL_ENV = "STEGOCAM_PROFILE_INTERVAL_MS"
+DEFAULT_INTERVAL_MS = 5
+EXTENSION = ".collapsed"
+
+profile_dir = os.environ.get(PROFILE_ENV) or None
+enabled = profile_dir is not None
+
+_lock = threading.Lock()
+_active = {}
+
+_SITE_PACKAGES = re.compile(r".*[/\\](?:site|dist)-packages[/\\]")
+_STDLIB = os.path.dirname(os.__file__) + os.sep
+
+
+# Paths relative to site-packages, the standard library or the working
+# directory, so profiles from different machines line up
+def _short_path(filename):
+    stripped = _SITE_PACKAGES.sub("", filename)
+    if stripped != filename:
+        return stripped
+    if filename.startswith(_STDLIB):
+        return filename[len(_STDLIB):]
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:  # another drive on Windows
+        return filename
+    return filename if relative.startswith("..") else relative
+
+
+# Samples one thread's stack until stopped
+class Sampler(threading.Thread):
+    def __init__(self, app, thread_id, interval):
+        super().__init__(name=f"stegocam-profiler-{app}", daemon=True)
+        self.app = app
+        self.tags = []
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._labels = {}
+        self._done = threading.Event()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:  # the thread exited without end()
+                self._orphaned()
+                return
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    # Write this rerun's profile unless begin() or end() already took it
+    def _orphaned(self):
+        with _lock:
+            if _active.get(self.thread_id) is not self:
+                return
+            del _active[self.thread_id]
+        self.tags.append("interrupted")
+        self.write(profile_dir)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def write(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        name = "-".join([self.app, *self.tags, str(int(time.time() * 1000)), str(os.getpid())])
+        name = re.sub(r"[^\w.-]+", "_", name)
+        path = os.path.join(directory, name + EXTENSION)
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def _interval():
+    try:
+        return max(float(os.environ.get(INTERVAL_ENV, DEFAULT_INTERVAL_MS)), 0.5) / 1000
+    except ValueError:
+        return DEFAULT_INTERVAL_MS / 1000
+
+
+def _finish(sampler, *tags):
+    sampler.stop()
+    sampler.tags.extend(tags)
+    return sampler.write(profile_dir)
+
+
+# Start profiling this rerun of `app` on the calling (script) thread
+def begin(app):
+    if not enabled:
+        return
+    thread_id = threading.get_ident()
+    sampler = Sampler(app, thread_id, _interval())
+    with _lock:
+        stale = _active.pop(thread_id, None)
+        _active[thread_id] = sampler
+    if stale is not None:
+        _finish(stale, "interrupted")
+    sampler.start()
+
+
+# Add tags to the file name of the current rerun's profile
+def tag(*labels):
+    if not enabled:
+        return
+    sampler = _active.get(threading.get_ident())
+    if sampler is not None:
+        sampler.tags.extend(str(label) for label in labels)
+
+
+# Stop profiling this rerun and write its collapsed stacks; returns the path
+def end():
+    if not enabled:
+        return None
+    with _lock:
+        sampler = _active.pop(threading.get_ident(), None)
+    return None if sampler is None else _finish(sampler)
+
+
+# ---------- HOTSPOT REPORT ----------
+
+
+def read_collapsed(path):
+    stacks = collections.Counter()
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack and count.isdigit():
+                stacks[stack] += int(count)
+    return stacks
+
+
+# Merge the collapsed-stack files in `directory` whose names contain every
+# one of `tags`; returns (file count, stacks)
+def load_profiles(directory, tags=()):
+    merged = collections.Counter()
+    files = 0
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(EXTENSION) and all(t in name for t in tags):
+            merged.update(read_collapsed(os.path.join(directory, name)))
+            files += 1
+    return files, merged
+
+
+# Top-N frames by self samples (the frame was the leaf) and by inclusive
+# samples (the frame was anywhere on the stack, counted once per sample);
+# frames matching `exclude` are dropped from both tables
+def hotspots(stacks, top=20, exclude=None):
+    pattern = re.compile(exclude) if exclude else None
+    own, inclusive = collections.Counter(), collections.Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for frame in set(frames):
+            inclusive[frame] += count
+
+    def rank(counter):
+        items = ((frame, n) for frame, n in counter.most_common() if not (pattern and pattern.search(frame)))
+        return [item for _, item in zip(range(top), items)]
+
+    return rank(own), rank(inclusive)
+
+
+def report(directory, top=20, tags=(), exclude=None, out=sys.stdout):
+    files, stacks = load_profiles(directory, tags)
+    total = sum(stacks.values())
+    if not total:
+        print(f"No samples in {directory}" + (f" tagged {', '.join(tags)}" if tags else "") + ".", file=out)
+        return stacks
+    print(f"{files} reruns, {total} samples", file=out)
+    own, inclusive = hotspots(stacks, top, exclude)
+    for title, rows in (("self", own), ("inclusive", inclusive)):
+        print(f"\ntop {len(rows)} by {title} samples:", file=out)
+        for frame, count in rows:
+            print(f"{count:8d} {100 * count / total:6.1f}%  {frame}", file=out)
+    return stacks
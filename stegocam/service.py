@@ -0,0 +1,146 @@
+import asyncio
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from . import codec, crypto
+
+# ========== DECRYPT SERVICE ==========
+#
+# A small local HTTP service that extracts and decrypts uploaded images off
+# the Streamlit script thread. An asyncio (Starlette + uvicorn) front end
+# accepts the uploads and hands each one to a process pool, so a large image
+# neither blocks other requests nor competes with the app process for its
+# interpreter lock, and the pool is sized independently of the app:
+#
+#   python -m stegocam serve [--host H] [--port P] [--workers N]
+#
+#   POST /decrypt   body: the image file; header X-Stegocam-Key: the key
+#                   200 -> the plaintext, with X-Stegocam-Codec (see codec.py)
+#                   400 unreadable image, 403 wrong key or corrupted data,
+#                   404 no embedded data, 413 upload too large
+#   GET  /health    {"status": "ok", "workers": N}
+#
+# The apps call decrypt_upload, which posts to the service when
+# STEGOCAM_SERVICE_URL is set (e.g. http://127.0.0.1:8765) and runs the same
+# code in-process otherwise. The key travels in a request header, so the
+# service is meant for localhost or a private network only.
+
+SERVICE_ENV = "STEGOCAM_SERVICE_URL"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_UPLOAD = 64 << 20
+REQUEST_TIMEOUT = 120
+
+KEY_HEADER = "X-Stegocam-Key"
+CODEC_HEADER = "X-Stegocam-Codec"
+
+OK, BAD_IMAGE, WRONG_KEY, NOT_FOUND, TOO_LARGE = 200, 400, 403, 404, 413
+
+MESSAGES = {
+    BAD_IMAGE: "Could not open the uploaded image.",
+    WRONG_KEY: "Incorrect key or corrupted encrypted data.",
+    NOT_FOUND: "No encrypted data found in this image, or it was modified after embedding.",
+    TOO_LARGE: f"Upload is larger than {MAX_UPLOAD >> 20} MiB.",
+}
+
+
+# Extract and decrypt one uploaded image file; returns (status, codec,
+# plaintext), where plaintext is None unless status is OK. Runs in a pool
+# worker for the service, so only bytes go in and out.
+def extract_and_decrypt(data, key):
+    from . import stego
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            header, encrypted_data = stego.read_container(image)
+    except (OSError, ValueError, Image.DecompressionBombError):  # unreadable, odd mode, or a pixel bomb
+        return BAD_IMAGE, codec.NONE, None
+    if encrypted_data is None:
+        return NOT_FOUND, header.codec, None
+    try:
+        return OK, header.codec, crypto.decrypt_bytes(encrypted_data, key, header.cipher)
+    except Exception:  # InvalidTag, InvalidToken, malformed key
+        return WRONG_KEY, header.codec, None
+
+
+# Extract and decrypt an uploaded image file through the service at
+# $STEGOCAM_SERVICE_URL, or in-process when it is not set; returns the same
+# (status, codec, plaintext) as extract_and_decrypt. Raises
+# requests.RequestException when the service cannot be reached.
+def decrypt_upload(data, key, url=None):
+    url = url or os.environ.get(SERVICE_ENV)
+    if not url:
+        return extract_and_decrypt(data, key)
+
+    import requests  # only needed with a service configured
+
+    response = requests.post(
+        url.rstrip("/") + "/decrypt", data=data, timeout=REQUEST_TIMEOUT,
+        headers={KEY_HEADER: key.decode() if isinstance(key, bytes) else key,
+                 "Content-Type": "application/octet-stream"},
+    )
+    payload_codec = int(response.headers.get(CODEC_HEADER, codec.NONE))
+    if response.status_code == OK:
+        return OK, payload_codec, response.content
+    if response.status_code in MESSAGES:
+        return response.status_code, payload_codec, None
+    response.raise_for_status()
+    raise requests.HTTPError(f"Unexpected response {response.status_code} from {url}.", response=response)
+
+
+# ASGI app for the service, with its own pool of `workers` processes (one per
+# core by default)
+def create_app(workers=None):
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Route
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(workers)
+
+    def error(status, payload_codec=codec.NONE):
+        return JSONResponse({"error": MESSAGES[status]}, status, headers={CODEC_HEADER: str(payload_codec)})
+
+    async def decrypt(request):
+        key = request.headers.get(KEY_HEADER)
+        if not key:
+            return JSONResponse({"error": f"Missing {KEY_HEADER} header."}, 401)
+        if int(request.headers.get("content-length") or 0) > MAX_UPLOAD:
+            return error(TOO_LARGE)
+
+        body = bytearray()
+        async for chunk in request.stream():
+            body += chunk
+            if len(body) > MAX_UPLOAD:
+                return error(TOO_LARGE)
+
+        loop = asyncio.get_running_loop()
+        status, payload_codec, plaintext = await loop.run_in_executor(
+            pool, extract_and_decrypt, bytes(body), key.encode())
+        if status != OK:
+            return error(status, payload_codec)
+        return Response(plaintext, media_type="application/octet-stream",
+                        headers={CODEC_HEADER: str(payload_codec)})
+
+    async def health(request):
+        return JSONResponse({"status": "ok", "workers": workers})
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        pool.shutdown(cancel_futures=True)
+
+    return Starlette(
+        routes=[Route("/decrypt", decrypt, methods=["POST"]), Route("/health", health)],
+        lifespan=lifespan,
+    )
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None):
+    import uvicorn
+
+    uvicorn.run(create_app(workers), host=host, port=port)
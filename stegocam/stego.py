@@ -0,0 +1,281 @@
+import numpy as np
+from PIL import Image
+
+from . import container, metrics
+
+# ========== LSB STEGANOGRAPHY ENGINE ==========
+#
+# Payloads are stored MSB-first in the low bits of consecutive channel bytes,
+# preceded by a container header (see container.py) that records their
+# length, checksum, bit depth, codec and cipher, so decoding reads exactly
+# header + payload.
+#
+# The header itself always sits in bit 0 of the RGB channels of the first
+# HEADER_PIXELS pixels, where it can be found without knowing the layout.
+# The payload starts at the next pixel and uses 1, 2 or 4 LSBs of each RGB
+# (or RGBA) channel; more bits per channel means proportionally fewer pixels
+# are touched, at the cost of more visible noise.
+#
+# Images written before the header existed carry the payload followed by the
+# 16-bit end marker 1111111100000000 instead; those are still decoded by
+# scanning for the marker.
+
+DELIMITER_BITS = np.array([1] * 8 + [0] * 8, dtype=np.uint8)
+DELIMITER = np.packbits(DELIMITER_BITS).tobytes()  # b'\xff\x00'
+
+
+# The header and the pixels whose RGB LSBs hold it
+HEADER_BITS = container.HEADER_SIZE * 8
+HEADER_PIXELS = -(-HEADER_BITS // 3)
+
+# The legacy scan reads the image in horizontal bands that start small and
+# double, so a short message near the top of the frame never touches the rest
+# of it. Row counts stay multiples of 8 so every band packs into whole bytes.
+FIRST_BAND_ROWS = 8
+MAX_BAND_ROWS = 256
+
+
+class CapacityError(ValueError):
+    def __init__(self, capacity, required):
+        self.capacity = capacity
+        self.required = required
+        super().__init__(
+            f"Image is too small (Capacity: {capacity} bits) to hold encrypted data ({required} bits)."
+        )
+
+
+# Shift amounts that split a byte into 8 // bits values, most significant first
+def _shifts(bits):
+    return [int(shift) for shift in range(8 - bits, -1, -bits)]
+
+
+# byte -> its 8 // bits values, so splitting a payload is a single np.take
+_SPLIT_TABLES = {
+    bits: ((np.arange(256, dtype=np.uint8)[:, None] >> np.array(_shifts(bits), dtype=np.uint8))
+           & ((1 << bits) - 1)).astype(np.uint8)
+    for bits in container.BIT_DEPTHS
+}
+
+
+# Split a payload into per-channel values of `bits` bits each, MSB first
+# (for bits=1 this is the same order as format(byte, '08b'))
+def split_bytes(data, bits=1):
+    raw = np.frombuffer(bytes(data), dtype=np.uint8)
+    if bits == 1:
+        return np.unpackbits(raw)
+    return np.take(_SPLIT_TABLES[bits], raw, axis=0).reshape(-1)
+
+
+# Inverse of split_bytes: the low `bits` bits of each sample, joined into bytes
+def join_values(samples, bits=1):
+    values = samples & ((1 << bits) - 1)
+    if bits == 1:
+        return np.packbits(values).tobytes()
+    values = values.reshape(-1, 8 // bits)
+    joined = np.zeros(len(values), dtype=np.uint8)
+    for column, shift in enumerate(_shifts(bits)):
+        joined |= values[:, column] << shift
+    return joined.tobytes()
+
+
+# Overwrite the low `bits` bits of flat[offset:offset + len(values)] in place,
+# in one vectorized pass
+def write_values(flat, values, bits=1, offset=0):
+    target = flat[offset:offset + values.size]
+    np.bitwise_and(target, 0xFF ^ ((1 << bits) - 1), out=target)
+    np.bitwise_or(target, values, out=target)
+
+
+# Total embeddable bits for a frame of the given pixel count and layout
+def capacity_bits(pixel_count, bits=1, channels=3):
+    return HEADER_BITS + max(pixel_count - HEADER_PIXELS, 0) * channels * bits
+
+
+# Raise CapacityError unless `size` payload bytes fit in a frame of the given
+# (width, height), without touching any pixels
+def check_capacity(frame_size, size, bits=1, use_alpha=False):
+    capacity = capacity_bits(frame_size[0] * frame_size[1], bits, 4 if use_alpha else 3)
+    required = HEADER_BITS + size * 8
+    if capacity < required:
+        raise CapacityError(capacity, required)
+
+
+# Smallest bit depth at which `size` payload bytes fit in the image
+def fit_bits(image, size, use_alpha=False):
+    channels = 4 if use_alpha else 3
+    pixel_count = image.size[0] * image.size[1]
+    required = HEADER_BITS + size * 8
+    for bits in container.BIT_DEPTHS:
+        if capacity_bits(pixel_count, bits, channels) >= required:
+            return bits
+    raise CapacityError(capacity_bits(pixel_count, container.BIT_DEPTHS[-1], channels), required)
+
+
+# Incremental LSB writer: payload bytes are written into a private copy of the
+# carrier as they arrive, with the length and CRC-32 accumulated on the way,
+# and the header goes in last. This lets an encrypting encoder stream straight
+# into the image without the payload ever existing as one buffer.
+#
+# bits selects how many LSBs per channel carry the payload. With bits=None the
+# writer starts at 1 bit and, when the next write would not fit, re-packs what
+# it has written so far at the next depth up; that re-read is bounded by the
+# carrier's capacity, not by the payload. use_alpha also stores payload in the
+# alpha channel and produces an RGBA image. codec and cipher are the ids the
+# payload was serialized and encrypted with (see codec.py and crypto.py),
+# recorded for the decoder.
+class PayloadWriter:
+    def __init__(self, image, bits=1, use_alpha=False, codec=0, cipher=0):
+        self.mode, self.channels = ('RGBA', 4) if use_alpha else ('RGB', 3)
+        if image.mode != self.mode:
+            image = image.convert(self.mode)
+        self._array = np.array(image, dtype=np.uint8)  # private, writable copy
+        self._pixels = self._array.reshape(-1, self.channels)
+        if len(self._pixels) < HEADER_PIXELS:
+            raise CapacityError(len(self._pixels) * 3, HEADER_BITS)
+        self._body = self._pixels[HEADER_PIXELS:].reshape(-1)
+
+        self._auto = bits is None
+        self.bits = 1 if bits is None else bits
+        self.codec = codec
+        self.cipher = cipher
+        self.length = 0
+        self._crc = 0
+        self._used = 0  # body samples written so far
+
+    def _capacity(self, bits):
+        return capacity_bits(len(self._pixels), bits, self.channels)
+
+    # Move everything written so far to the smallest depth that also fits
+    # `extra` more bytes
+    def _promote(self, extra):
+        required = HEADER_BITS + (self.length + extra) * 8
+        for bits in container.BIT_DEPTHS:
+            if bits > self.bits and self._capacity(bits) >= required:
+                written = join_values(self._body[:self._used], self.bits)
+                values = split_bytes(written, bits)
+                write_values(self._body, values, bits)
+                self.bits, self._used = bits, values.size
+                return
+        raise CapacityError(self._capacity(container.BIT_DEPTHS[-1]), required)
+
+    def write(self, data):
+        data = bytes(data)
+        if self._capacity(self.bits) < HEADER_BITS + (self.length + len(data)) * 8:
+            if not self._auto:
+                raise CapacityError(self._capacity(self.bits), HEADER_BITS + (self.length + len(data)) * 8)
+            self._promote(len(data))
+
+        values = split_bytes(data, self.bits)
+        write_values(self._body, values, self.bits, self._used)
+        self._used += values.size
+        self.length += len(data)
+        self._crc = container.checksum_update(data, self._crc)
+        return len(data)
+
+    # Write the header into bit 0 of the RGB channels of the first pixels and
+    # return the finished image
+    def finish(self):
+        header = container.pack_header(self.length, self._crc, self.bits, self.channels, self.codec, self.cipher)
+        header_rgb = self._pixels[:HEADER_PIXELS, :3]
+        header_lsb = (header_rgb & 1).reshape(-1)
+        header_lsb[:HEADER_BITS] = split_bytes(header)
+        header_rgb &= 0xFE
+        header_rgb |= header_lsb.reshape(header_rgb.shape)
+        return Image.fromarray(self._array, self.mode)
+
+
+# Embed encrypted data into image (LSB Steganography)
+#
+# bits=None picks the smallest depth that fits; see PayloadWriter for the
+# other options.
+@metrics.timed("embed")
+def embed_data_in_image(image, encrypted_data, bits=1, use_alpha=False, codec=0, cipher=0):
+    encrypted_data = bytes(encrypted_data)
+    if bits is None:
+        bits = fit_bits(image, len(encrypted_data), use_alpha)
+    writer = PayloadWriter(image, bits, use_alpha, codec, cipher)
+    writer.write(encrypted_data)
+    return writer.finish()
+
+
+# Read `count` channel samples starting at sample `start` of the image's
+# flattened RGB (channels=3) or RGBA (channels=4) data, converting only the
+# rows that hold them
+def read_samples(image, start, count, channels=3):
+    width, height = image.size
+    row_samples = width * channels
+    end = start + count
+    if end > row_samples * height:
+        return None
+
+    first_row = start // row_samples
+    last_row = -(-end // row_samples)
+    band = image.crop((0, first_row, width, last_row))
+    mode = 'RGBA' if channels == 4 else 'RGB'
+    if band.mode != mode:
+        band = band.convert(mode)
+
+    offset = start - first_row * row_samples
+    return np.asarray(band, dtype=np.uint8).reshape(-1)[offset:offset + count]
+
+
+# Sample offset at which the payload described by `header` begins
+def payload_start(header):
+    return HEADER_PIXELS * header.channels
+
+
+# Yield the RGB channel bytes of the image band by band, top to bottom,
+# converting only the rows that are actually read
+def iter_channel_bands(image):
+    width, height = image.size
+    top, rows = 0, FIRST_BAND_ROWS
+    while top < height:
+        band = image.crop((0, top, width, min(top + rows, height)))
+        if band.mode != 'RGB':
+            band = band.convert('RGB')
+        yield np.asarray(band, dtype=np.uint8).reshape(-1)
+        top += rows
+        rows = min(rows * 2, MAX_BAND_ROWS)
+
+
+# Decode a delimiter-terminated payload from an image made before the header
+#
+# Fernet tokens are base64 text, so every byte is < 0x80 and the marker can
+# only ever appear byte-aligned; searching the packed bytes for b'\xff\x00'
+# finds the same position the old bit-string scan did.
+def extract_legacy_data(image):
+    packed = bytearray()
+    for band in iter_channel_bands(image):
+        lsb = band & 1
+        usable = lsb.size - lsb.size % 8
+        search_from = max(len(packed) - 1, 0)
+        packed += np.packbits(lsb[:usable]).tobytes()
+
+        delimiter_pos = packed.find(DELIMITER, search_from)
+        if delimiter_pos != -1:
+            return bytes(packed[:delimiter_pos])
+    return None
+
+
+# Read the container from an image: returns (header, payload), where header
+# is container.LEGACY for delimiter-terminated images and payload is None
+# when nothing valid is found
+@metrics.timed("extract")
+def read_container(image):
+    head = read_samples(image, 0, HEADER_BITS)
+    header = container.unpack_header(join_values(head)) if head is not None else None
+    if header is None:
+        return container.LEGACY, extract_legacy_data(image)
+
+    samples = read_samples(image, payload_start(header), header.length * 8 // header.bits, header.channels)
+    if samples is None:
+        return header, None
+    payload = join_values(samples, header.bits)
+    if container.checksum(payload) != header.checksum:
+        return header, None
+    return header, payload
+
+
+# Extract encrypted data from image
+def extract_data_from_image(image):
+    return read_container(image)[1]
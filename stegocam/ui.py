@@ -0,0 +1,449 @@
+import datetime
+
+import streamlit as st
+from PIL import Image
+
+from . import caching, camera, codec, crypto, metrics, pipeline, profiling, service
+
+# ========== SHARED APP UI ==========
+#
+# The pieces app2-app6 have in common - style, capture, filter preview,
+# metadata form, passcodes and keys, the encrypted download and the decrypt
+# tab - so every app shows and handles them the same way, and the whole page
+# of the dual-camera apps (app5, app6). The apps only lay these out; the work
+# runs in the rest of the package (caching, pipeline, crypto, service), which
+# does not need Streamlit and is what the CLI and the benchmarks use.
+
+# Cipher for newly embedded payloads; decryption follows the image header
+PAYLOAD_CIPHER = crypto.AES_GCM
+
+STYLE = """
+<style>
+    .main { background-color: #f7f9fc; }
+    .stButton button {
+        background-color: #ff4b4b;
+        color: white;
+        border-radius: 10px;
+        padding: 10px 20px;
+        font-weight: bold;
+        transition: background-color 0.3s;
+    }
+    .stDownloadButton button {
+        background-color: #00a8ff;
+        color: white;
+        border-radius: 10px;
+        padding: 10px 20px;
+        font-weight: bold;
+        transition: background-color 0.3s;
+    }
+    h1 {
+        color: #1a1a1a;
+        text-align: center;
+        padding-bottom: 10px;
+    }
+    .encryption-box, .decryption-box {
+        padding: 20px;
+        border-radius: 12px;
+        margin-bottom: 25px;
+        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+    }
+    .encryption-box { border-left: 5px solid #00a8ff; background-color: #e8f4fc; }
+    .decryption-box { border-left: 5px solid #ff4b4b; background-color: #f0e8fc; }
+    .step-container {
+        background-color: #f0f8ff;
+        border-radius: 10px;
+        padding: 15px;
+        margin-bottom: 20px;
+        border-left: 4px solid #00a8ff;
+    }
+    .step-title {
+        font-weight: bold;
+        color: #00a8ff;
+        margin-bottom: 10px;
+    }
+</style>
+"""
+
+PASSCODE_INFO = "🔑 **This is your 6-character passcode.** You need this exact string to decrypt later."
+
+
+def apply_style():
+    st.markdown(STYLE, unsafe_allow_html=True)
+
+
+def footer(credits="Streamlit, Fernet, and LSB Steganography"):
+    st.markdown("---")
+    st.markdown(f"<p style='text-align:center; color:#777;'>Made with ❤️ using {credits}</p>", unsafe_allow_html=True)
+
+
+def _capacity_error(e):
+    st.error(f"❌ Image is too small (Capacity: {e.capacity} bits) to hold encrypted data ({e.required} bits).")
+
+
+# ---------- CAPTURE ----------
+
+# Open a captured or uploaded image file and decode it
+def open_image(file):
+    with metrics.span("decode"):
+        img = Image.open(file)
+        img.load()
+    return img
+
+
+# Custom camera with live preview (see camera.py); returns the captured frame,
+# or None before the first capture or when the frame cannot be decoded
+def camera_component(facing_mode="user", profile=None, allow_switch=False):
+    try:
+        return camera.camera_input(facing_mode=facing_mode, allow_switch=allow_switch,
+                                   profile=profile or camera.DEFAULT_PROFILE)
+    except Exception as e:
+        st.error(f"Error processing captured image: {e}")
+        return None
+
+
+# The frame next to its filtered preview, with the filter menu; returns the
+# selected filter. `initial` preselects a filter (e.g. the live preview's).
+def filter_preview(img, digest, initial=None):
+    from . import filters
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.subheader("Your Selfie")
+        st.image(caching.cached_preview(img, "None", digest), width="stretch")
+
+    with col2:
+        st.subheader("Filters")
+        filter_option = st.selectbox(
+            "Select a filter:",
+            filters.FILTERS,
+            index=filters.FILTERS.index(initial) if initial else 0
+        )
+
+        # Previewed on a downscaled proxy, cached per frame + filter, so
+        # browsing filters and unrelated widget changes stay fast
+        st.image(caching.cached_preview(img, filter_option, digest), width="stretch")
+    return filter_option
+
+
+# ---------- ENCRYPTION ----------
+
+# Date, time and message inputs; returns the metadata text to embed
+def metadata_form():
+    now = datetime.datetime.now()
+    col_date, col_time = st.columns(2)
+    with col_date:
+        selected_date = st.date_input("Date", now.date())
+    with col_time:
+        selected_time = st.time_input("Time", now.time())
+
+    message = st.text_area("Custom Secret Message", "This is my encrypted selfie! Remember this moment.", height=100)
+    return pipeline.metadata_text(selected_date, selected_time, message)
+
+
+# Key for a typed passcode, or None (with a warning) until it has 6 characters
+def typed_passcode(passcode, required=False):
+    if passcode and len(passcode) == crypto.PASSCODE_LENGTH:
+        return crypto.passcode_key(passcode)
+    if passcode:
+        st.warning("Passcode must be exactly 6 characters.")
+    elif required:
+        st.warning("Please enter your 6-character passcode.")
+    return None
+
+
+# A typed Fernet-style key as bytes, or None (with an error) when it is invalid
+def typed_key(key, required=False):
+    if not key:
+        if required:
+            st.warning("Please enter an encryption key.")
+        return None
+    try:
+        crypto.check_key(key.encode())
+    except ValueError:
+        st.error("❌ Invalid encryption key!")
+        return None
+    return key.encode()
+
+
+# New or existing passcode; returns the key, or None until a valid passcode is
+# entered. A new passcode stays the same across reruns until `scope` changes.
+def passcode_picker(scope):
+    key_option = st.radio("Encryption Passcode", ["Generate New Passcode", "Use Existing Passcode"], index=0)
+    if key_option == "Generate New Passcode":
+        passcode, key = caching.stable_secret("generated_passcode", scope, crypto.new_passcode)
+        st.code(passcode, language="text")
+        st.info(PASSCODE_INFO)
+        return key
+    return typed_passcode(st.text_input("Enter Existing Passcode (6 characters)", type="password",
+                                        max_chars=crypto.PASSCODE_LENGTH))
+
+
+# New or existing Fernet-style key, as passcode_picker
+def key_picker(scope):
+    key_option = st.radio("Encryption Key", ["Generate New Key", "Use Existing Key"], index=0)
+    if key_option == "Generate New Key":
+        key = caching.stable_secret("generated_key", scope, crypto.generate_key)
+        st.code(key.decode(), language="text")
+        st.info("💾 Save this key to decrypt later.")
+        return key
+    return typed_key(st.text_input("Enter Existing Key", type="password"))
+
+
+# Check up front that the encrypted data will fit, since the embed itself
+# only runs when the download is requested
+def fits_in_image(image, data, cipher=PAYLOAD_CIPHER):
+    from . import stego
+
+    try:
+        stego.check_capacity(image.size, crypto.encrypted_size(len(data.encode()), cipher))
+        return True
+    except stego.CapacityError as e:
+        _capacity_error(e)
+        return False
+
+
+# Download button for the frame with `data` embedded. The full-resolution
+# filter, encrypt, embed and PNG encode only run when it is clicked, and are
+# cached per frame, filter, data and key (see caching.cached_embed_png).
+def embed_download(img, filter_option, data, key, digest, file_name="encrypted_secret_selfie.png"):
+    if not fits_in_image(img, data):
+        return
+    st.success("✅ Ready! The full-resolution image is encrypted and embedded when you download it.")
+    st.download_button(
+        label="⬇️ Download Encrypted Selfie (.png)",
+        data=lambda: caching.cached_embed_png(img, filter_option, data, key, PAYLOAD_CIPHER, digest),
+        file_name=file_name,
+        mime="image/png"
+    )
+
+
+# Compress and encrypt `image` straight into the LSBs of `carrier` and return
+# the PNG bytes, or None (with an error) when it does not fit. Cached per
+# image pair, key and format, so reruns don't re-encrypt the whole selfie.
+def hidden_image_png(carrier, image, key, image_codec=codec.WEBP, quality=codec.DEFAULT_QUALITY):
+    from . import stego
+
+    try:
+        return caching.cached_hidden_image_png(carrier, image, key, image_codec, quality)
+    except stego.CapacityError as e:
+        _capacity_error(e)
+        return None
+
+
+# ---------- DECRYPTION ----------
+
+# File uploader with a preview; returns the uploaded file, or None when there
+# is none or it is not a readable image
+def upload_image(label="Upload encrypted image (.png recommended)"):
+    uploaded_file = st.file_uploader(label, type=["png", "jpg", "jpeg"])
+    if uploaded_file is None:
+        return None
+    try:
+        st.image(Image.open(uploaded_file), caption="Uploaded Encrypted Image", width="stretch")
+    except Exception as e:
+        st.error(f"❌ Could not open image: {e}")
+        return None
+    return uploaded_file
+
+
+def show_message(payload_codec, plaintext):
+    st.success("✅ Decryption Successful! Secret Message Revealed:")
+    st.code(plaintext.decode(errors="replace"), language="text")
+
+
+def show_hidden_image(payload_codec, plaintext):
+    hidden_selfie = codec.decode_image(plaintext, payload_codec)
+    st.success("✅ Decryption Successful! Hidden Selfie Revealed:")
+    st.image(hidden_selfie, caption="Hidden Selfie", width="stretch")
+    st.download_button(
+        label="⬇️ Download Hidden Selfie (.png)",
+        data=caching.png_bytes(hidden_selfie),
+        file_name="hidden_selfie.png",
+        mime="image/png"
+    )
+
+
+# Upload, passcode (or key) and decrypt button; a decrypted payload is shown
+# with show(payload codec, plaintext), e.g. show_message
+def decrypt_section(button_label, show, passcode=True):
+    uploaded_file = upload_image()
+    if uploaded_file is None:
+        return
+
+    if passcode:
+        secret = st.text_input("Enter 6-character Passcode", key="decryption_key_input", type="password",
+                               max_chars=crypto.PASSCODE_LENGTH)
+    else:
+        secret = st.text_input("Enter Encryption Key", key="decryption_key_input", type="password")
+    if not st.button(button_label):
+        return
+
+    profiling.tag("decrypt")
+    key = typed_passcode(secret, required=True) if passcode else typed_key(secret, required=True)
+    if key is None:
+        return
+    try:
+        # Extracted and decrypted in the decrypt service when one is
+        # configured (see stegocam/service.py)
+        status, payload_codec, plaintext = service.decrypt_upload(uploaded_file.getvalue(), key)
+        if status == service.OK:
+            show(payload_codec, plaintext)
+        elif status == service.NOT_FOUND:
+            st.error("⚠️ No encrypted data found in this image, or it was modified after embedding.")
+        else:
+            st.error(f"❌ Incorrect {'passcode' if passcode else 'key'} or corrupted encrypted data.")
+    except Exception as e:
+        st.error(f"❌ An internal error occurred: {e}")
+
+
+# ---------- DUAL CAMERA APP ----------
+#
+# app5 and app6: capture the main image with the back camera, then a selfie
+# with the front camera, and hide the encrypted selfie inside the main image.
+# The current step and both captures live in session state.
+
+DUAL_CAMERA_STATE = ("back_camera_image", "front_camera_image", "passcode", "fernet_key")
+
+
+# Step 1: Capture Back Camera Image
+def _back_camera_step():
+    st.markdown('<div class="step-title">Step 1: Capture Main Image (Back Camera)</div>', unsafe_allow_html=True)
+    st.write("Point your back camera at the subject you want to photograph.")
+
+    back_img = camera_component(facing_mode='environment')
+
+    if back_img is not None:
+        st.session_state.back_camera_image = back_img
+        st.image(back_img, caption="Main Image (Back Camera)", width="stretch")
+
+        if st.button("Continue to Front Camera", key="continue_to_front"):
+            st.session_state.step = 2
+            st.rerun()
+
+
+# Step 2: Capture Front Camera Image
+def _front_camera_step():
+    st.markdown('<div class="step-title">Step 2: Capture Selfie (Front Camera)</div>', unsafe_allow_html=True)
+    st.write("Now take a selfie with your front camera. This image will be encrypted and hidden in the main image.")
+
+    # The selfie only travels as the hidden payload, so a thumbnail-sized
+    # capture is all the pipeline needs
+    front_img = camera_component(facing_mode='user', profile='thumbnail')
+
+    if front_img is not None:
+        st.session_state.front_camera_image = front_img
+        st.image(front_img, caption="Selfie (Front Camera)", width="stretch")
+
+        if st.button("Encrypt Selfie in Main Image", key="encrypt_images"):
+            st.session_state.step = 3
+            st.session_state.passcode = None
+            st.rerun()
+
+    if st.button("Back to Main Image", key="back_to_main"):
+        st.session_state.step = 1
+        st.rerun()
+
+
+# Step 3: Encrypt and Combine
+def _hidden_selfie_step():
+    st.markdown('<div class="step-title">Step 3: Encrypt Selfie in Main Image</div>', unsafe_allow_html=True)
+
+    # Display both images
+    col1, col2 = st.columns(2)
+    with col1:
+        st.image(st.session_state.back_camera_image, caption="Main Image (Back Camera)", width="stretch")
+    with col2:
+        st.image(st.session_state.front_camera_image, caption="Selfie (Front Camera)", width="stretch")
+
+    # Hidden selfie format
+    col_format, col_quality = st.columns(2)
+    with col_format:
+        selfie_format = st.selectbox("Hidden selfie format", ["WEBP", "JPEG", "PNG", "ZLIB", "LZMA"], index=0)
+    selfie_codec = codec.codec_id(selfie_format)
+    with col_quality:
+        selfie_quality = st.slider("Quality", 10, 100, codec.DEFAULT_QUALITY, disabled=selfie_codec not in codec.LOSSY)
+
+    # Generate encryption key once per image pair, so reruns keep the same passcode
+    if st.session_state.passcode is None:
+        st.session_state.passcode, st.session_state.fernet_key = crypto.new_passcode()
+
+    st.code(st.session_state.passcode, language="text")
+    st.info("🔑 **This is your 6-character passcode.** You need this exact string to decrypt the hidden selfie later.")
+
+    # Encrypt the front camera image and embed it into the back camera image
+    png_data = hidden_image_png(
+        st.session_state.back_camera_image,
+        st.session_state.front_camera_image,
+        st.session_state.fernet_key,
+        selfie_codec,
+        selfie_quality,
+    )
+
+    if png_data:
+        st.success("✅ Selfie encrypted and embedded successfully!")
+        st.image(png_data, caption="Final Encrypted Image", width="stretch")
+
+        st.download_button(
+            label="⬇️ Download Encrypted Image (.png)",
+            data=png_data,
+            file_name="dual_camera_encrypted_image.png",
+            mime="image/png"
+        )
+
+    if st.button("Start Over", key="start_over"):
+        st.session_state.step = 1
+        for name in DUAL_CAMERA_STATE:
+            st.session_state[name] = None
+        st.rerun()
+
+
+DUAL_CAMERA_STEPS = {1: _back_camera_step, 2: _front_camera_step, 3: _hidden_selfie_step}
+
+
+# The whole dual-camera app page; `app` names it in profiles
+def dual_camera_app(app):
+    # Sampled per rerun when STEGOCAM_PROFILE_DIR is set
+    profiling.begin(app)
+
+    st.set_page_config(
+        page_title="🔐 Dual Camera Encryption App",
+        page_icon="📷",
+        layout="centered"
+    )
+    apply_style()
+
+    st.title("🔐 Dual Camera Encryption App")
+    st.write("Capture an image with the back camera, then automatically capture a selfie with the front camera and encrypt it within the first image!")
+
+    if 'step' not in st.session_state:
+        st.session_state.step = 1
+    profiling.tag(f"step{st.session_state.step}")
+    for name in DUAL_CAMERA_STATE:
+        if name not in st.session_state:
+            st.session_state[name] = None
+
+    st.markdown('<div class="step-container">', unsafe_allow_html=True)
+    DUAL_CAMERA_STEPS[st.session_state.step]()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # Decryption Tab
+    tab1, tab2 = st.tabs(["📸 Capture & Encrypt", "🔓 Decrypt Image"])
+
+    with tab1:
+        # The capture and encryption process is handled above
+        pass
+
+    with tab2:
+        st.markdown('<div class="decryption-box">', unsafe_allow_html=True)
+        st.subheader("🔓 Decrypt Hidden Selfie")
+
+        decrypt_section("Decrypt Hidden Selfie", show_hidden_image)
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    footer()
+
+    # Stage timings, when STEGOCAM_METRICS is set
+    metrics.sidebar()
+    profiling.end()
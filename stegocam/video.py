@@ -0,0 +1,147 @@
+import io
+import os
+import struct
+import zipfile
+
+import numpy as np
+from PIL import Image
+
+from . import container, stego
+
+# ========== VIDEO STEGANOGRAPHY ==========
+#
+# An encrypted message is split into `count` segments and segment i is
+# embedded into every frame whose sequence number is i modulo count, so the
+# message repeats for as long as the stream runs and any `count` consecutive
+# frames carry all of it, whatever frames were dropped in between. Each frame
+# holds an ordinary container (see stego.py) whose payload starts with
+#
+#   stream id (4s) | segment index (H) | segment count (H)
+#
+# followed by the segment bytes. The stream id keeps segments from two
+# different streams apart.
+#
+# All per-frame work is planned up front: a frame is layout-identical to the
+# next, so VideoEmbedder precomputes, for the leading samples of the frame
+# that carry data, one shared AND mask and one OR pattern per segment.
+# Embedding is then two vectorized passes over that prefix, with no Python
+# loop over bits, pixels or bytes. Frames must reach the extractor
+# losslessly (e.g. zipped as PNGs by zip_frames); a lossy video codec
+# destroys the LSBs.
+
+SEGMENT_HEADER = struct.Struct(">4sHH")
+DEFAULT_SEGMENTS = 30
+
+FRAME_EXTENSIONS = (".png", ".bmp", ".tif", ".tiff")
+FRAME_NAME = "frame-{:05d}.png"
+# Fastest zlib level: the frames are mostly noise in the low bits anyway, so
+# higher levels cost several times the time for a few percent
+ZIP_PNG_LEVEL = 1
+
+
+# Precomputed per-frame bit plans for embedding `encrypted_data` into frames
+# of the given (width, height); raises stego.CapacityError when a segment
+# does not fit into one frame at `bits` LSBs per channel
+class VideoEmbedder:
+    def __init__(self, encrypted_data, frame_size, count=DEFAULT_SEGMENTS, bits=1, cipher=0):
+        encrypted_data = bytes(encrypted_data)
+        count = max(min(count, len(encrypted_data)), 1)
+        segment_size = -(-len(encrypted_data) // count)
+        stream_id = os.urandom(4)
+
+        stego.check_capacity(frame_size, SEGMENT_HEADER.size + segment_size, bits)
+
+        start = stego.HEADER_PIXELS * 3
+        end = start + (SEGMENT_HEADER.size + segment_size) * 8 // bits
+        self.frame_size = tuple(frame_size)
+        self.count = count
+        self.frames = 0
+
+        # Header bits go in bit 0 of the first HEADER_BITS samples; the samples
+        # padding the header out to whole pixels keep their original value
+        self._mask = np.full(end, 0xFF ^ ((1 << bits) - 1), dtype=np.uint8)
+        self._mask[:stego.HEADER_BITS] = 0xFE
+        self._mask[stego.HEADER_BITS:start] = 0xFF
+        self._plans = np.zeros((count, end), dtype=np.uint8)
+        for index in range(count):
+            segment = encrypted_data[index * segment_size:(index + 1) * segment_size]
+            payload = SEGMENT_HEADER.pack(stream_id, index, count) + segment
+            header = container.pack_header(len(payload), container.checksum(payload), bits, 3, cipher=cipher)
+            plan = self._plans[index]
+            plan[:stego.HEADER_BITS] = stego.split_bytes(header)
+            values = stego.split_bytes(payload, bits)
+            # a shorter last segment just leaves zero LSBs after its payload
+            plan[start:start + values.size] = values
+
+    # Embed the next segment into an RGB uint8 array of the frame size, in place
+    def embed(self, rgb):
+        flat = rgb.reshape(-1)[:self._mask.size]
+        np.bitwise_and(flat, self._mask, out=flat)
+        np.bitwise_or(flat, self._plans[self.frames % self.count], out=flat)
+        self.frames += 1
+        return rgb
+
+
+# Read one frame's segment: (cipher, stream id, index, count, segment), or
+# None when the frame carries no valid container
+def read_segment(frame):
+    if isinstance(frame, np.ndarray):
+        frame = Image.fromarray(frame)
+    header, payload = stego.read_container(frame)
+    if payload is None or header.version == 0 or len(payload) < SEGMENT_HEADER.size:
+        return None
+    stream_id, index, count = SEGMENT_HEADER.unpack(payload[:SEGMENT_HEADER.size])
+    return header.cipher, stream_id, index, count, payload[SEGMENT_HEADER.size:]
+
+
+# Reassemble a message from a sequence of frames (images or RGB arrays);
+# returns (cipher, encrypted_data) for the first stream whose segments are
+# all found, or None
+def extract_video_message(frames):
+    streams = {}
+    for frame in frames:
+        segment = read_segment(frame)
+        if segment is None:
+            continue
+        cipher, stream_id, index, count, data = segment
+        segments = streams.setdefault((stream_id, count), {})
+        segments[index] = data
+        if len(segments) == count:
+            return cipher, b"".join(segments[i] for i in range(count))
+    return None
+
+
+# Zip a sequence of RGB arrays as numbered PNG frames, which iter_frames reads
+# back; the PNG compression is all there is, so the entries are only stored
+def zip_frames(frames, compress_level=ZIP_PNG_LEVEL):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for index, rgb in enumerate(frames):
+            png = io.BytesIO()
+            Image.fromarray(rgb).save(png, format="PNG", compress_level=compress_level)
+            archive.writestr(FRAME_NAME.format(index), png.getvalue())
+    return buffer.getvalue()
+
+
+# Frames of a recording: a directory or zip of lossless images (read in name
+# order) or a lossless video file (e.g. FFV1), decoded one at a time
+def iter_frames(path):
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(FRAME_EXTENSIONS):
+                with Image.open(os.path.join(path, name)) as frame:
+                    frame.load()
+                    yield frame
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if name.lower().endswith(FRAME_EXTENSIONS):
+                    with Image.open(io.BytesIO(archive.read(name))) as frame:
+                        frame.load()
+                        yield frame
+    else:
+        import av  # only needed for video files
+
+        with av.open(path) as recording:
+            for frame in recording.decode(video=0):
+                yield frame.to_ndarray(format="rgb24")